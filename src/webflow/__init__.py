@@ -1,3 +1,4 @@
 from .config        import *
 from .utils         import *
+from .scheduler     import *
 
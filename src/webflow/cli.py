@@ -0,0 +1,466 @@
+import argparse
+import contextlib
+import csv
+import io
+import json
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+from .config import authenticate
+from .cms import Collection, Site, Validator
+from .scheduler import get_scheduler, set_rate_limit, BULK
+from .utils import parallelize, deadline_scope, LatencyTracker
+
+
+FORMATS = ('json', 'jsonl', 'csv')
+_TEXT_TYPES = ('PlainText', 'RichText', 'Email', 'Phone', 'Link', 'Color', 'Video')
+
+
+class Progress:
+    """
+    A Progress object counts processed items, and reports the throughput live on the standard error.
+
+    Attributes:
+        label (str): name of the operation.
+        items (int): number of items processed so far.
+        errors (int): number of items that failed so far.
+        total (int): expected number of items, if known.
+    """
+
+    def __init__(self, label: str, quiet: bool = False, interval: float = 0.5):
+        '''
+        Create a new Progress object, and start reporting.
+
+        Args:
+            label (str): name of the operation.
+            quiet (bool, optional): do not print anything. Defaults to False.
+            interval (float, optional): seconds between reports. Defaults to 0.5.
+        '''
+        self.label = label
+        self.items = 0
+        self.errors = 0
+        self.total = None
+        self._quiet = quiet
+        self._interval = interval
+        self._start = time.monotonic()
+        self._stats = dict(get_scheduler().stats)
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self._thread = threading.Thread(target = self._report, daemon = True)
+
+        if not quiet:
+            self._thread.start()
+
+
+    def add(self, items: int = 1, errors: int = 0) -> None:
+        with self._lock:
+            self.items += items
+            self.errors += errors
+
+
+    @property
+    def seconds(self) -> float:
+        return time.monotonic() - self._start
+
+
+    def stats(self) -> dict[str, int]:
+        '''
+        Requests and rate limit hits since the operation started.
+        '''
+        stats = get_scheduler().stats
+        return {key: stats[key] - self._stats.get(key, 0) for key in stats}
+
+
+    def line(self) -> str:
+        total = f'/{self.total}' if self.total is not None else ''
+        rate = self.items / max(self.seconds, 1e-9)
+        stats = self.stats()
+
+        return (f'{self.label}: {self.items}{total} items, {rate:.1f} items/s, {self.errors} errors, '
+            f'{stats["requests"]} requests, {stats["throttled"]} rate limited (429)')
+
+
+    def close(self) -> None:
+        self._done.set()
+
+        if not self._quiet:
+            self._thread.join()
+            print('\r' + self.line(), file = sys.stderr)
+
+
+    def _report(self) -> None:
+        while not self._done.wait(self._interval):
+            print('\r' + self.line(), end = '', file = sys.stderr, flush = True)
+
+
+def read_items(path: str, format: str = None, validator: Validator = None) -> list[dict[str, any]]:
+    '''
+    Read item data from a JSON, JSON lines, or CSV file ('-' for the standard input).
+    CSV cells are read as text, except those of number, boolean, and reference or image fields (if a
+    collection's validator is given), and JSON lists or objects in fields that are not text.
+
+    Args:
+        path (str): file path.
+        format (str, optional): file format, guessed from the extension if not given. Defaults to None.
+        validator (Validator, optional): validator of the collection, to read CSV cells by field type.
+            Defaults to None.
+
+    Returns:
+        list[dict[str, any]]: list of item data.
+    '''
+    format = format or _guess_format(path)
+    text = _read_text(path)
+
+    if format == 'json':
+        return json.loads(text)
+    if format == 'jsonl':
+        return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+    return [{key: _parse_cell(key, value, validator) for key, value in row.items() if value != ''} 
+        for row in csv.DictReader(io.StringIO(text))]
+
+
+def write_items(items: list[dict[str, any]], path: str, format: str = None) -> None:
+    '''
+    Write item data to a JSON, JSON lines, or CSV file ('-' for the standard output).
+    In CSV files, values that are not strings or numbers are written as JSON.
+
+    Args:
+        items (list[dict[str, any]]): list of item data.
+        path (str): file path.
+        format (str, optional): file format, guessed from the extension if not given. Defaults to None.
+    '''
+    format = format or _guess_format(path)
+
+    with (contextlib.nullcontext(sys.stdout) if path == '-' else open(path, 'w', encoding = 'utf-8', newline = '')) as f:
+        if format == 'json':
+            json.dump(items, f, ensure_ascii = False)
+        elif format == 'jsonl':
+            f.writelines(json.dumps(item, ensure_ascii = False) + '\n' for item in items)
+        else:
+            keys = list(dict.fromkeys(key for item in items for key in item))
+            writer = csv.DictWriter(f, keys)
+            writer.writeheader()
+            writer.writerows({key: _format_cell(value) for key, value in item.items()} for item in items)
+
+
+def read_ids(path: str) -> list[str]:
+    '''
+    Read item IDs, one per line ('-' for the standard input).
+    '''
+    return [line.strip() for line in _read_text(path).splitlines() if line.strip()]
+
+
+def export_items(collection: 'Collection', args: argparse.Namespace, progress: Progress) -> list[dict[str, any]]:
+    '''
+    Fetch all items of a collection, page by page in parallel.
+    '''
+    page = min(args.chunk_size, 100)
+    start = time.monotonic()
+
+    with deadline_scope(args.deadline):
+        progress.total = collection.get_items(0, 1, BULK)['total']
+
+    remaining = None if args.deadline is None else args.deadline - (time.monotonic() - start)
+
+    def get_page(offset):
+        items = collection.get_items(offset, page, BULK)['items']
+        progress.add(len(items))
+        return items
+
+    pages = parallelize(get_page, range(0, progress.total, page), args.concurrency, deadline = remaining)
+    return [item for items in pages for item in items]
+
+
+def cmd_export(args: argparse.Namespace, progress: Progress) -> dict[str, any]:
+    items = export_items(Collection(args.collection_id), args, progress)
+    write_items(items, args.output, args.format)
+
+    return {'collection': args.collection_id}
+
+
+def cmd_import(args: argparse.Namespace, progress: Progress) -> dict[str, any]:
+    collection = Collection(args.collection_id)
+    validator = collection.validator
+    items = [_strip_system_fields(item, validator) for item in read_items(args.file, args.format, validator)]
+    progress.total = len(items)
+
+    if not args.no_validate:
+        taken = {item.get('slug') for item in export_items(collection, args, Progress('fetch', True))} if args.check_slugs else ()
+        items = collection.validate_items(items, taken_slugs = taken)
+
+    def post_item(fields):
+        try:
+            item = collection.post_item(fields, draft = args.draft, priority = BULK, validate = False)
+        except Exception as e:
+            progress.add(errors = 1)
+            return {'error': str(e), 'fields': fields}
+
+        progress.add()
+        return item
+
+    results = parallelize(post_item, items, args.concurrency, deadline = args.deadline)
+    failed = [result for result in results if 'error' in result]
+
+    if args.output:
+        write_items(results, args.output, args.format)
+
+    return {'collection': args.collection_id, 'failed': failed[:100]}
+
+
+def cmd_publish(args: argparse.Namespace, progress: Progress) -> dict[str, any]:
+    if args.site:
+        response = Site(args.site).publish(args.domain)
+        progress.add()
+        return {'site': args.site, 'response': response}
+
+    collection = Collection(args.collection)
+    ids = read_ids(args.ids) if args.ids else [item['_id'] for item in export_items(collection, args, Progress('fetch', True))]
+    progress.total = len(ids)
+    data = collection.publish_items(ids, args.deadline, args.chunk_size, args.concurrency, 
+        _progress_hook(progress, 'publishedItemIds'))
+
+    return {'collection': args.collection, 'failed': data['errors']}
+
+
+def cmd_delete(args: argparse.Namespace, progress: Progress) -> dict[str, any]:
+    collection = Collection(args.collection_id)
+    ids = read_ids(args.ids) if args.ids else [item['_id'] for item in export_items(collection, args, Progress('fetch', True))]
+    progress.total = len(ids)
+    data = collection.delete_items(ids, args.deadline, args.chunk_size, args.concurrency, 
+        _progress_hook(progress, 'deletedItemIds'))
+
+    return {'collection': args.collection_id, 'failed': data['errors']}
+
+
+def cmd_snapshot(args: argparse.Namespace, progress: Progress) -> dict[str, any]:
+    site = Site(args.site_id)
+    os.makedirs(args.output, exist_ok = True)
+    extension = args.format or 'jsonl'
+
+    with open(os.path.join(args.output, 'site.json'), 'w', encoding = 'utf-8') as f:
+        json.dump(dict(site), f, ensure_ascii = False)
+
+    collections = {}
+
+    for data in site.get_collections():
+        collection = Collection(data['_id'])
+        items = export_items(collection, args, progress)
+        write_items(items, os.path.join(args.output, f'{data["slug"]}.{extension}'), extension)
+
+        with open(os.path.join(args.output, f'{data["slug"]}.schema.json'), 'w', encoding = 'utf-8') as f:
+            json.dump(dict(collection), f, ensure_ascii = False)
+
+        collections[data['slug']] = len(items)
+
+    return {'site': args.site_id, 'collections': collections}
+
+
+def cmd_bench(args: argparse.Namespace, progress: Progress) -> dict[str, any]:
+    collection = Collection(args.collection_id)
+    page = min(args.chunk_size, 100)
+    latency = LatencyTracker(window = args.requests, min_samples = 1)
+
+    def get_page(i):
+        start = time.monotonic()
+        items = collection.get_items((i % args.pages) * page, page, BULK)['items']
+        latency.record(time.monotonic() - start)
+        progress.add(len(items))
+
+    parallelize(get_page, range(args.requests), args.concurrency, deadline = args.deadline)
+
+    return {
+        'collection': args.collection_id,
+        'requests_per_second': args.requests / max(progress.seconds, 1e-9),
+        'latency_p50': latency.percentile(50),
+        'latency_p95': latency.percentile(95),
+        'latency_max': latency.percentile(100),
+    }
+
+
+def _progress_hook(progress: Progress, result_key: str) -> callable:
+    '''
+    Count the processed and failed IDs of each chunk of a bulk operation (see `batch_request`).
+    '''
+    return lambda response: progress.add(len(response.get(result_key, [])), len(response.get('errors', [])))
+
+
+def _strip_system_fields(item: dict[str, any], validator: Validator) -> dict[str, any]:
+    '''
+    Remove the fields that cannot be written (like `_id` or `created-on`), so exported items can be imported.
+    '''
+    return {key: value for key, value in item.items() if not key.startswith('_') and key not in validator.readonly}
+
+
+def _read_text(path: str) -> str:
+    if path == '-':
+        return sys.stdin.read()
+
+    with open(path, encoding = 'utf-8') as f:
+        return f.read()
+
+
+def _guess_format(path: str) -> str:
+    extension = os.path.splitext(path)[1].lstrip('.').lower()
+    return extension if extension in FORMATS else 'jsonl'
+
+
+def _parse_cell(key: str, value: str, validator: Validator = None) -> any:
+    kind = validator.types.get(key) if validator else None
+
+    if kind == 'Number':
+        try:
+            return validator.fields[key](value)
+        except ValueError:
+            return value
+
+    if kind == 'Bool':
+        return {'true': True, 'false': False}.get(value.lower(), value)
+
+    # lists and objects (e.g. references or images) are written as JSON
+    if kind not in _TEXT_TYPES and value[:1] in ('[', '{'):
+        try:
+            return json.loads(value)
+        except ValueError:
+            return value
+
+    return value
+
+
+def _format_cell(value: any) -> any:
+    return value if isinstance(value, (str, int, float)) and not isinstance(value, bool) else json.dumps(value)
+
+
+def make_parser() -> argparse.ArgumentParser:
+    '''
+    Build the command line parser.
+
+    Returns:
+        argparse.ArgumentParser: the parser of `python -m webflow`.
+    '''
+    common = argparse.ArgumentParser(add_help = False)
+    common.add_argument('--token', default = os.environ.get('WEBFLOW_API_TOKEN'),
+        help = 'API token (defaults to the WEBFLOW_API_TOKEN environment variable)')
+    common.add_argument('--concurrency', type = int, default = 50, help = 'max parallel requests (default: 50)')
+    common.add_argument('--rate-limit', type = int, default = 60, 
+        help = 'requests per minute, 0 for no limit (default: 60)')
+    common.add_argument('--chunk-size', type = int, default = 100, help = 'items per request, at most 100 (default: 100)')
+    common.add_argument('--format', choices = FORMATS, help = 'file format (default: from the file extension)')
+    common.add_argument('--deadline', type = float, help = 'give up after this many seconds')
+    common.add_argument('--summary', help = "write a JSON summary of the run to this file ('-' for stdout)")
+    common.add_argument('--quiet', action = 'store_true', help = 'do not print live progress')
+
+    parser = argparse.ArgumentParser(prog = 'python -m webflow', description = 'Bulk operations on the WebFlow CMS.')
+    commands = parser.add_subparsers(dest = 'command', required = True)
+
+    export = commands.add_parser('export', parents = [common], help = 'export all items of a collection')
+    export.add_argument('collection_id')
+    export.add_argument('-o', '--output', default = '-', help = "output file (default: stdout)")
+    export.set_defaults(run = cmd_export)
+
+    import_ = commands.add_parser('import', parents = [common], help = 'add items to a collection from a file')
+    import_.add_argument('collection_id')
+    import_.add_argument('file', help = "JSON, JSON lines or CSV file ('-' for stdin); read-only and "
+        "system fields (like `_id` or `created-on`) are ignored, so exported files can be imported")
+    import_.add_argument('-o', '--output', help = 'write the created items to this file')
+    import_.add_argument('--draft', action = 'store_true', help = 'create the items as drafts')
+    import_.add_argument('--no-validate', action = 'store_true', help = 'skip the local schema validation')
+    import_.add_argument('--check-slugs', action = 'store_true', 
+        help = 'fetch the slugs already in the collection, so that new slugs do not collide with them')
+    import_.set_defaults(run = cmd_import)
+
+    publish = commands.add_parser('publish', parents = [common], help = 'publish a site or items of a collection')
+    target = publish.add_mutually_exclusive_group(required = True)
+    target.add_argument('--site', help = 'ID of the site to publish')
+    target.add_argument('--collection', help = 'ID of the collection whose items to publish')
+    publish.add_argument('--domain', action = 'append', help = 'domain to publish the site to (default: all)')
+    publish.add_argument('--ids', help = "file with one item ID per line ('-' for stdin; default: all items)")
+    publish.set_defaults(run = cmd_publish)
+
+    delete = commands.add_parser('delete', parents = [common], help = 'delete items of a collection')
+    delete.add_argument('collection_id')
+    which = delete.add_mutually_exclusive_group(required = True)
+    which.add_argument('--ids', help = "file with one item ID per line ('-' for stdin)")
+    which.add_argument('--all', action = 'store_true', help = 'delete all items of the collection')
+    delete.set_defaults(run = cmd_delete)
+
+    snapshot = commands.add_parser('snapshot', parents = [common], help = 'export all collections of a site')
+    snapshot.add_argument('site_id')
+    snapshot.add_argument('-o', '--output', required = True, help = 'output directory')
+    snapshot.set_defaults(run = cmd_snapshot)
+
+    bench = commands.add_parser('bench', parents = [common], help = 'measure read throughput on a collection')
+    bench.add_argument('collection_id')
+    bench.add_argument('--requests', type = int, default = 100, help = 'number of requests (default: 100)')
+    bench.add_argument('--pages', type = int, default = 1, help = 'number of distinct pages to read (default: 1)')
+    bench.set_defaults(run = cmd_bench)
+
+    return parser
+
+
+def main(argv: list[str] = None) -> int:
+    '''
+    Run the command line interface.
+
+    Args:
+        argv (list[str], optional): command line arguments. Defaults to `sys.argv[1:]`.
+
+    Returns:
+        int: exit status (0 if no item failed, 1 otherwise).
+    '''
+    args = make_parser().parse_args(argv)
+
+    if not args.token:
+        print('An API token is required (use --token or set WEBFLOW_API_TOKEN).', file = sys.stderr)
+        return 2
+
+    # keep the standard output clean for exported data
+    try:
+        with contextlib.redirect_stdout(sys.stderr):
+            authenticate(args.token)
+    except Exception as e:
+        print(f'Authentication failed: {e}', file = sys.stderr)
+        return 2
+
+    set_rate_limit(args.rate_limit or None)
+    started = datetime.now(timezone.utc)
+    progress = Progress(args.command, args.quiet)
+    status = 'ok'
+
+    try:
+        result = args.run(args, progress)
+    except Exception as e:
+        result, status = {'error': f'{type(e).__name__}: {e}'}, 'error'
+    finally:
+        progress.close()
+
+    stats = progress.stats()
+    summary = {
+        'command': args.command,
+        'status': status,
+        'started_at': started.isoformat(),
+        'seconds': round(progress.seconds, 3),
+        'items': progress.items,
+        'errors': progress.errors,
+        'items_per_second': round(progress.items / max(progress.seconds, 1e-9), 3),
+        'requests': stats['requests'],
+        'rate_limited': stats['throttled'],
+        'concurrency': args.concurrency,
+        'rate_limit': args.rate_limit,
+        'chunk_size': args.chunk_size,
+        **result,
+    }
+
+    if args.summary == '-':
+        print(json.dumps(summary))
+    elif args.summary:
+        with open(args.summary, 'w', encoding = 'utf-8') as f:
+            json.dump(summary, f, indent = 2)
+
+    if status == 'error':
+        print(result['error'], file = sys.stderr)
+
+    return 0 if status == 'ok' and not progress.errors else 1
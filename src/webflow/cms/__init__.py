@@ -1,4 +1,9 @@
 from .collection    import *
 from .item          import *
 from .site          import *
-
+from .cache         import *
+from .webhook       import *
+from .buffer        import *
+from .publish       import *
+from .schema        import *
+from .asset         import *
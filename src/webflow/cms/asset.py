@@ -0,0 +1,183 @@
+import hashlib
+import json
+import mimetypes
+import os
+import threading
+import uuid
+
+import requests
+
+
+def hash_file(path: str, chunk_size: int = 1 << 20) -> str:
+    '''
+    Compute the MD5 hash of a file, reading it in chunks (the file is never fully loaded in memory).
+    WebFlow identifies uploaded assets by their MD5 hash.
+
+    Args:
+        path (str): path of the file.
+        chunk_size (int, optional): bytes read at a time. Defaults to 1 MiB.
+
+    Returns:
+        str: hexadecimal hash of the file's content.
+    '''
+    md5 = hashlib.md5()
+
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(chunk_size), b''):
+            md5.update(block)
+
+    return md5.hexdigest()
+
+
+class AssetCache:
+    """
+    An AssetCache remembers the URL of each file already uploaded to a site, by content hash.
+
+    The cache is stored as a JSON file, so uploads are skipped across runs; new entries are kept in
+    memory until `save` is called (`Site.upload_assets` does it once per call). It is safe to share 
+    between threads.
+
+    Attributes:
+        path (str): path of the JSON file, or `None` to keep the cache in memory only.
+    """
+
+    def __init__(self, path: str = os.path.join(os.path.expanduser('~'), '.cache', 'fast-webflow', 'assets.json')):
+        '''
+        Create a new AssetCache object, loading the existing cache if any.
+
+        Args:
+            path (str, optional): path of the JSON file, or `None` to keep the cache in memory only. 
+                Defaults to `~/.cache/fast-webflow/assets.json`.
+        '''
+        self.path = path
+        self._lock = threading.Lock()
+        self._sites = {}
+        self._dirty = False
+
+        if path and os.path.exists(path):
+            with open(path, encoding = 'utf-8') as f:
+                self._sites = json.load(f)
+
+
+    def get(self, site_id: str, file_hash: str) -> str:
+        '''
+        Get the URL of a file already uploaded to a site.
+
+        Args:
+            site_id (str): ID of the site.
+            file_hash (str): MD5 hash of the file (see `hash_file`).
+
+        Returns:
+            str: URL of the asset, or `None` if the file was never uploaded.
+        '''
+        return self._sites.get(site_id, {}).get(file_hash)
+
+
+    def put(self, site_id: str, file_hash: str, url: str) -> None:
+        '''
+        Remember the URL of a file uploaded to a site (in memory; see `save`).
+
+        Args:
+            site_id (str): ID of the site.
+            file_hash (str): MD5 hash of the file (see `hash_file`).
+            url (str): URL of the asset.
+        '''
+        with self._lock:
+            self._sites.setdefault(site_id, {})[file_hash] = url
+            self._dirty = True
+
+
+    def save(self) -> None:
+        '''
+        Write the cache to its JSON file, if it changed.
+        The file is replaced atomically, so a crash never leaves it half written.
+        '''
+        with self._lock:
+            if not self.path or not self._dirty:
+                return
+
+            content = json.dumps(self._sites)
+            self._dirty = False
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok = True)
+        temp_path = f'{self.path}.{uuid.uuid4().hex}.tmp'
+
+        with open(temp_path, 'w', encoding = 'utf-8') as f:
+            f.write(content)
+
+        os.replace(temp_path, self.path)
+
+
+def upload_file(upload_url: str, fields: dict[str, str], path: str, timeout: tuple[float, float] = (5, 300)) -> None:
+    '''
+    Upload a file to a presigned form upload target (as returned by WebFlow's create asset endpoint).
+    The multipart body is streamed from disk, so large files are never fully loaded in memory.
+
+    Args:
+        upload_url (str): URL of the upload target.
+        fields (dict[str, str]): form fields to send along the file (the upload's signature).
+        path (str): path of the file.
+        timeout (tuple[float, float], optional): connect and read timeouts in seconds. Defaults to (5, 300).
+    '''
+    body = _MultipartStream(fields, path)
+    headers = {'Content-Type': f'multipart/form-data; boundary={body.boundary}'}
+
+    with body:
+        response = requests.post(upload_url, data = body, headers = headers, timeout = timeout)
+
+    response.raise_for_status()
+
+
+class _MultipartStream:
+    '''
+    File-like multipart/form-data body: form fields, then the file read lazily from disk.
+    '''
+
+    def __init__(self, fields: dict[str, str], path: str):
+        self.boundary = uuid.uuid4().hex
+        name = os.path.basename(path)
+        content_type = fields.get('Content-Type') or mimetypes.guess_type(name)[0] or 'application/octet-stream'
+
+        head = b''.join(
+            f'--{self.boundary}\r\nContent-Disposition: form-data; name="{key}"\r\n\r\n{value}\r\n'.encode()
+            for key, value in fields.items())
+        head += (f'--{self.boundary}\r\nContent-Disposition: form-data; name="file"; filename="{name}"\r\n'
+            f'Content-Type: {content_type}\r\n\r\n').encode()
+        tail = f'\r\n--{self.boundary}--\r\n'.encode()
+
+        self._file = open(path, 'rb')
+        self._parts = [head, self._file, tail]
+        self.len = len(head) + os.path.getsize(path) + len(tail)
+
+
+    def read(self, size: int = -1) -> bytes:
+        data = b''
+
+        while self._parts and (size < 0 or len(data) < size):
+            part = self._parts[0]
+            wanted = -1 if size < 0 else size - len(data)
+
+            if isinstance(part, bytes):
+                chunk = part if wanted < 0 else part[:wanted]
+                self._parts[0] = part[len(chunk):]
+            else:
+                chunk = part.read(wanted)
+
+            data += chunk
+
+            if not chunk or not self._parts[0]:
+                self._parts.pop(0)
+
+        return data
+
+
+    def __len__(self) -> int:
+        return self.len
+
+
+    def __enter__(self) -> '_MultipartStream':
+        return self
+
+
+    def __exit__(self, *args) -> None:
+        self._file.close()
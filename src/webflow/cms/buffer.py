@@ -0,0 +1,235 @@
+import threading
+
+import requests
+
+from ..utils import parallelize_multiargs
+from ..scheduler import BULK
+from .cache import ItemCache
+
+
+class PatchBuffer:
+    """
+    A PatchBuffer delays and merges partial updates (patches) of the items in a collection.
+
+    Patches to the same item are merged into a single one, and all buffered patches are sent
+    concurrently when the buffer holds `max_items` items, when `max_delay` seconds have passed since
+    the first buffered patch, or when `flush` is called. After a flush, the touched items are
+    published in batches of up to 100 IDs (unless the changes are drafts). Use the buffer as a context
+    manager to flush on exit.
+
+    Patches that fail for a transient reason (timeouts, connection errors, rate limits, 5xx errors) are
+    put back in the buffer and sent again with the next flush, up to `max_attempts` times; other failures
+    are reported with their exception. Results of time-triggered flushes are passed to `on_flush`, and an
+    exception raised by one of them is raised again by the next call to `patch` or `flush`.
+
+    Attributes:
+        collection (Collection): collection the items belong to.
+        max_items (int): number of distinct buffered items that triggers a flush.
+        max_delay (float): seconds after the first buffered patch that trigger a flush (`None` disables it).
+        publish (bool): publish the patched items after each flush (ignored for drafts).
+        draft (bool): draft changes (True) or stage for publish (False).
+        cache (ItemCache): optional local cache updated with the patched items' data.
+        max_attempts (int): number of flushes an item's patch is tried in before being reported as failed.
+        on_flush (callable): optional function called with the result of every flush.
+    """
+
+    def __init__(self, collection: 'Collection', max_items: int = 100, max_delay: float = 5.0, 
+            publish: bool = True, draft: bool = False, cache: ItemCache = None, max_attempts: int = 3,
+            on_flush: callable = None):
+        '''
+        Create a new PatchBuffer object.
+
+        Args:
+            collection (Collection): collection the items belong to.
+            max_items (int, optional): number of distinct buffered items that triggers a flush. 
+                Defaults to 100.
+            max_delay (float, optional): seconds after the first buffered patch that trigger a flush; 
+                `None` to only flush on size or explicitly. Defaults to 5.0.
+            publish (bool, optional): publish the patched items after each flush; drafts are never 
+                published. Defaults to True.
+            draft (bool, optional): draft changes (True) or stage for publish (False). Defaults to False.
+            cache (ItemCache, optional): local cache to update with the patched items. Defaults to None.
+            max_attempts (int, optional): number of flushes an item's patch is tried in before being 
+                reported as failed. Defaults to 3.
+            on_flush (callable, optional): function called with the result of every flush (see `flush`),
+                including the time-triggered ones. Defaults to None.
+        '''
+        self.collection = collection
+        self.max_items = max_items
+        self.max_delay = max_delay
+        self.publish = publish
+        self.draft = draft
+        self.cache = cache
+        self.max_attempts = max_attempts
+        self.on_flush = on_flush
+        self._pending = {}
+        self._attempts = {}
+        self._timer = None
+        self._error = None
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+
+    def __enter__(self) -> 'PatchBuffer':
+        return self
+
+
+    def __exit__(self, *args) -> None:
+        self.flush()
+
+
+    def patch(self, item_id: str, fields: dict[str, any]) -> None:
+        '''
+        Buffer a partial update of an item.
+        Fields are merged with those already buffered for the same item (later values win).
+
+        Args:
+            item_id (str): ID of the item to update.
+            fields (dict[str, any]): new object data (only that which changes).
+
+        Raises:
+            Exception: the error of a failed time-triggered flush, if any since the last call.
+        '''
+        self._raise_error()
+
+        with self._lock:
+            self._pending.setdefault(item_id, {}).update(fields)
+            full = len(self._pending) >= self.max_items
+
+            if not full:
+                self._schedule()
+
+        if full:
+            self.flush()
+
+
+    def flush(self) -> dict[str, list[any]]:
+        '''
+        Send all buffered patches concurrently, then publish the touched items (if `publish` is set and
+        `draft` is not).
+        Failed patches do not stop the others: transient failures are put back in the buffer (until
+        `max_attempts`), and the others are returned under the `errors` key, with their exception.
+
+        Raises:
+            Exception: the error of a failed time-triggered flush, if any since the last call.
+
+        Returns:
+            dict[str, list[any]]: list of patched (key `patchedItemIds`), published (key 
+                `publishedItemIds`) and retried (key `retriedItemIds`) IDs, and of failures (key 
+                `errors`, as `{'id': id, 'error': exception}` dictionaries, or with the API's error for 
+                failed publishes, see `batch_request`).
+        '''
+        self._raise_error()
+        return self._flush()
+
+
+    def _flush(self) -> dict[str, list[any]]:
+        '''
+        Flush without checking for earlier errors (see `flush`).
+        '''
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+
+            data = {'patchedItemIds': [], 'publishedItemIds': [], 'retriedItemIds': [], 'errors': []}
+
+            if not pending:
+                return data
+
+            returns = parallelize_multiargs(self._send, pending.items())
+            retries = {}
+
+            for (item_id, fields), (response, error) in zip(pending.items(), returns):
+                if error is None:
+                    self._attempts.pop(item_id, None)
+                    data['patchedItemIds'].append(item_id)
+
+                    if self.cache is not None:
+                        self.cache.apply(response)
+
+                elif _is_transient(error) and self._attempts.get(item_id, 0) + 1 < self.max_attempts:
+                    self._attempts[item_id] = self._attempts.get(item_id, 0) + 1
+                    retries[item_id] = fields
+
+                else:
+                    self._attempts.pop(item_id, None)
+                    data['errors'].append({'id': item_id, 'error': error})
+
+            # newer patches of the same items win over the retried ones
+            if retries:
+                with self._lock:
+                    for item_id, fields in retries.items():
+                        self._pending[item_id] = {**fields, **self._pending.get(item_id, {})}
+
+                    self._schedule()
+
+                data['retriedItemIds'] = list(retries)
+
+            # publishing would make the changes staged as drafts live
+            if self.publish and not self.draft and data['patchedItemIds']:
+                published = self.collection.publish_items(data['patchedItemIds'])
+                data['publishedItemIds'] = published['publishedItemIds']
+                data['errors'] += published['errors']
+
+            if self.on_flush is not None:
+                self.on_flush(data)
+
+            return data
+
+
+    def _schedule(self) -> None:
+        '''
+        Start the flush timer, if needed (must be called holding `_lock`).
+        '''
+        if self._timer is None and self.max_delay is not None:
+            self._timer = threading.Timer(self.max_delay, self._timed_flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+
+    def _timed_flush(self) -> None:
+        '''
+        Flush from the timer thread, keeping any error for the next `patch` or `flush` call.
+        '''
+        try:
+            self._flush()
+        except Exception as e:
+            self._error = e
+
+
+    def _raise_error(self) -> None:
+        error, self._error = self._error, None
+
+        if error is not None:
+            raise error
+
+
+    def _send(self, item_id: str, fields: dict[str, any]) -> tuple[dict[str, any], Exception]:
+        '''
+        Send one merged patch, returning the response or the error instead of raising.
+        '''
+        try:
+            return self.collection.patch_item(item_id, fields, draft = self.draft, priority = BULK), None
+        except Exception as e:
+            return None, e
+
+
+def _is_transient(error: Exception) -> bool:
+    '''
+    Whether a failed request may succeed if sent again later.
+    '''
+    if isinstance(error, (requests.Timeout, requests.ConnectionError, TimeoutError)):
+        return True
+
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        return error.response.status_code == 429 or error.response.status_code >= 500
+
+    return False
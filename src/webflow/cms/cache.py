@@ -0,0 +1,78 @@
+import threading
+from collections import UserDict
+
+
+class ItemCache(UserDict):
+    """
+    An ItemCache is a local mirror of the items in one collection.
+
+    The object behaves like a dictionary, where its keys are item IDs (`_id` throught the API Docs)
+    and its values are the item's data as returned by the API. It is meant to be filled once
+    (see `refresh`) and then kept up to date by applying changes as they happen, for instance
+    from a `WebhookReceiver`, so that readers see fresh data without polling the API.
+
+    Attributes:
+        collection_id (str): ID field (often `_id`) of the mirrored collection.
+        data (dict): dictionary of item data, keyed by item ID.
+    """
+
+    def __init__(self, collection_id: str, items: list[dict[str, any]] = None):
+        '''
+        Create a new ItemCache object.
+
+        Args:
+            collection_id (str): ID field (often `_id`) of the mirrored collection.
+            items (list[dict[str, any]], optional): initial items data. Defaults to None.
+        '''
+        super(ItemCache, self).__init__()
+        self.collection_id = collection_id
+        self._lock = threading.RLock()
+
+        for item in items or []:
+            self.apply(item)
+
+
+    def refresh(self, collection: 'Collection') -> 'ItemCache':
+        '''
+        Replace the cache's content with all items currently in the collection.
+
+        Args:
+            collection (Collection): collection to fetch the items from.
+
+        Returns:
+            ItemCache: this same object, for chaining.
+        '''
+        items = collection.get_all_items()
+
+        with self._lock:
+            self.data = {item['_id']: item for item in items}
+
+        return self
+
+
+    def apply(self, item: dict[str, any]) -> None:
+        '''
+        Insert or update an item in the cache.
+        Fields that are present in the cache but not in `item` are kept, so partial data (like the
+        response of a PATCH) can be applied safely.
+
+        Args:
+            item (dict[str, any]): item data, must contain the `_id` key.
+        '''
+        with self._lock:
+            current = self.data.get(item['_id'], {})
+            self.data[item['_id']] = {**current, **item}
+
+
+    def discard(self, item_id: str) -> bool:
+        '''
+        Remove an item from the cache, if present.
+
+        Args:
+            item_id (str): ID of the item to remove.
+
+        Returns:
+            bool: `True` if the item was in the cache, `False` otherwise.
+        '''
+        with self._lock:
+            return self.data.pop(item_id, None) is not None
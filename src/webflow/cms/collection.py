@@ -1,11 +1,14 @@
 import requests
+import time
 from collections import UserDict
 from functools import partial
-from itertools import repeat
 
-from ..utils import try_request, parallelize, parallelize_multiargs
+from ..utils import try_request, parallelize, batch_request, deadline_scope
 from ..config import make_headers
 from ..entity import Entity
+from ..scheduler import BULK
+from .buffer import PatchBuffer
+from .schema import Validator, get_validator
 
 
 class Collection(Entity):
@@ -53,104 +56,197 @@ class Collection(Entity):
         return self._get()
 
 
-    def post_item(self, fields: dict[str,any], draft: bool = False) -> dict[str, any]:
+    @property
+    def validator(self) -> Validator:
+        '''
+        Validator compiled from this collection's field schema (cached per collection).
+        '''
+        return get_validator(self.id, self.data['fields'])
+
+
+    def validate_items(self, fields_list: list[dict[str,any]], partial: bool = False, 
+            taken_slugs: set[str] = ()) -> list[dict[str, any]]:
+        '''
+        Check and normalize a batch of item data locally, without sending anything.
+        Missing slugs are generated from the items' names. See `Validator.validate_all` for more information.
+
+        Args:
+            fields_list (list[dict[str,any]]): list of item data.
+            partial (bool, optional): `True` for partial updates (required fields may be missing). 
+                Defaults to False.
+            taken_slugs (set[str], optional): slugs already in use in the collection. Defaults to ().
+
+        Raises:
+            ValidationError: if any item is not valid (with all errors of all items).
+
+        Returns:
+            list[dict[str, any]]: normalized data of each item.
+        '''
+        return self.validator.validate_all(fields_list, partial, taken_slugs)
+
+
+    def post_item(self, fields: dict[str,any], draft: bool = False, priority: str = None, 
+            validate: bool = True) -> dict[str, any]:
         '''
         Add an item to the collection.
 
         Args:
             fields (dict[str,any]): item data (only fields' key:value pairs, not _archived and _draft)
             draft (bool, optional): draft the item or publish it directly. Defaults to False.
+            priority (str, optional): priority class of the request. Defaults to `priority`.
+            validate (bool, optional): check and normalize the data locally first (see `validate_items`).
+                Defaults to True.
+
+        Raises:
+            ValidationError: if `validate` is set and the data is not valid.
 
         Returns:
             dict[str, any]: if successful, information about the added item (including its slug).
         '''
+        if validate:
+            fields = self.validator.validate(fields)
+
         payload = {'fields': {'_archived': False, '_draft': draft}}
         payload['fields'].update(fields)
         
-        return self._post(self._items_url, payload)
+        return self._post(self._items_url, payload, priority)
     
 
-    def post_items(self, fields_list: list[dict[str,any]], draft: bool = False) -> list[dict[str, any]]:
+    def patch_item(self, item_id: str, fields: dict[str,any], draft: bool = False, 
+            priority: str = None, validate: bool = True) -> dict[str, any]:
+        '''
+        Update an item's data partially, without fetching it first or afterwards.
+        Prefer this over `Item.patch` when the item's data is not needed locally.
+
+        Args:
+            item_id (str): ID of the item to update.
+            fields (dict[str,any]): new object data (only that which changes).
+            draft (bool, optional): draft changes (True) or stage for publish (False). Defaults to False.
+            priority (str, optional): priority class of the request. Defaults to `priority`.
+            validate (bool, optional): check and normalize the data locally first. Defaults to True.
+
+        Raises:
+            ValidationError: if `validate` is set and the data is not valid.
+
+        Returns:
+            dict[str, any]: if successful, information about the updated item.
+        '''
+        if validate:
+            fields = self.validator.validate(fields, partial = True)
+
+        payload = {'fields': {'_archived': False, '_draft': draft}}
+        payload['fields'].update(fields)
+
+        return self._patch(f'{self._items_url}/{item_id}', payload, priority)
+
+
+    def write_buffer(self, *args, **kwargs) -> PatchBuffer:
+        '''
+        Create a write-behind buffer that merges item patches and sends them in bulk.
+        See `PatchBuffer` for the arguments and more information.
+
+        Returns:
+            PatchBuffer: a new, empty buffer on this collection.
+        '''
+        return PatchBuffer(self, *args, **kwargs)
+
+
+    def post_items(self, fields_list: list[dict[str,any]], draft: bool = False, 
+            deadline: float = None, validate: bool = True, check_slugs: bool = False) -> list[dict[str, any]]:
         '''
         Add multiple items to the collection.
         This method is a wrapper for multiple `post_item` method calls in parallel. Refer to that
-        for more information.
+        for more information. The whole batch is validated before any request is sent, so that one
+        invalid item does not leave the import half done.
 
         Args:
             fields_list (list[dict[str,any]]): list of item data.
             draft (bool, optional): draft the item or publish it directly. Defaults to False.
+            deadline (float, optional): max number of seconds for the whole operation; when it expires
+                pending requests are cancelled and `TimeoutError` is raised. Defaults to None.
+            validate (bool, optional): check and normalize the data locally first (see `validate_items`).
+                Defaults to True.
+            check_slugs (bool, optional): fetch the slugs of the items already in the collection first, so 
+                that generated slugs do not collide with them, and given ones that do are reported before 
+                anything is sent. Otherwise slugs are only checked within the batch. Only used if `validate` 
+                is set. Defaults to False.
+
+        Raises:
+            ValidationError: if `validate` is set and any item is not valid.
 
         Returns:
             list[dict[str, any]]: one data dictionary per added item.
         '''
-        post_item = partial(self.post_item, draft = draft)
-        data = parallelize(post_item, fields_list)
+        if validate:
+            taken = {item.get('slug') for item in self.get_all_items(deadline)} if check_slugs else ()
+            fields_list = self.validate_items(fields_list, taken_slugs = taken)
+
+        post_item = partial(self.post_item, draft = draft, priority = BULK, validate = False)
+        data = parallelize(post_item, fields_list, deadline = deadline)
         
         return data
 
 
-    def publish_items(self, item_ids: list[str]) -> dict[str, list[str]]:
+    def publish_items(self, item_ids: list[str], deadline: float = None, chunk_size: int = None, 
+            threads: int = 50, progress: callable = None) -> dict[str, list[any]]:
         '''
         Publish a list of items that are already in the collection.
         This method is optimized to split the list of items into several lists of length up to 100
         and send the requests concurrently. For instance, 350 items will be published in 4 requests.
+        If a request is rejected because of some invalid IDs, only those are reported as failed
+        (see `batch_request`).
 
         Args:
             item_ids (list[str]): list of item IDs to publish.
+            deadline (float, optional): max number of seconds for the whole operation; when it expires
+                pending requests are cancelled and `TimeoutError` is raised. Defaults to None.
+            chunk_size (int, optional): IDs per request, capped at the API's max of 100. Defaults to 100.
+            threads (int, optional): number of parallel requests. Defaults to 50.
+            progress (callable, optional): function called with each chunk's response (see `batch_request`).
+                Defaults to None.
 
         Returns:
-            dict[str, list[str]]: list of successful (key `publishedItemIds`) and failed (key `errors`) IDs.
+            dict[str, list[any]]: list of successful IDs (key `publishedItemIds`), and of failures (key `errors`, 
+                as `{'id': id, 'error': body}` dictionaries).
         '''
-        max_items = self._max_items_per_request  # API rule
         url = self._url + '/items/publish'
-        data = {}
-
-        # split IDs into lists of max 100 items
-        item_ids = [item_ids[i:i+max_items] for i in range(0, len(item_ids), max_items)]
-        payloads = [{"itemIds": ids} for ids in item_ids]
-
-        # send parallel requests
-        urls_and_data = zip(repeat(url), payloads)
-        returns  = parallelize_multiargs(self._put, urls_and_data)
+        send = lambda ids: self._put(url, {"itemIds": ids}, BULK)
+        chunk_size = min(chunk_size or self._max_items_per_request, self._max_items_per_request)  # API rule
 
-        # merge responses
-        for key in ['publishedItemIds', 'errors']:
-            data[key] = [item for resp in returns for item in resp[key]]
-        
-        return data
+        return batch_request(send, item_ids, ['publishedItemIds'], chunk_size, threads, deadline, 
+            on_result = progress)
     
 
-    def delete_items(self, item_ids: list[str]) -> dict[str, list[any]]:
+    def delete_items(self, item_ids: list[str], deadline: float = None, chunk_size: int = None, 
+            threads: int = 50, progress: callable = None) -> dict[str, list[any]]:
         '''
         Delete a list of items from the collection.
         This method is optimized to split the list of items into several lists of length up to 100
-        and send the requests concurrently. For instance, 350 items will be published in 4 requests.
+        and send the requests concurrently. For instance, 350 items will be deleted in 4 requests.
+        If a request is rejected because of some invalid IDs, only those are reported as failed
+        (see `batch_request`).
 
         Args:
             item_ids (list[str]): list of item IDs to delete.
+            deadline (float, optional): max number of seconds for the whole operation; when it expires
+                pending requests are cancelled and `TimeoutError` is raised. Defaults to None.
+            chunk_size (int, optional): IDs per request, capped at the API's max of 100. Defaults to 100.
+            threads (int, optional): number of parallel requests. Defaults to 50.
+            progress (callable, optional): function called with each chunk's response (see `batch_request`).
+                Defaults to None.
 
         Returns:
-            dict[str, list[str]]: list of successful (key `deletedItemIds`) and failed (key `errors`) IDs.
+            dict[str, list[any]]: list of successful IDs (key `deletedItemIds`), and of failures (key `errors`, 
+                as `{'id': id, 'error': body}` dictionaries).
         '''
-        max_items = self._max_items_per_request  # API rule
-        data = {}
-
-        # split IDs into lists of max 100 items
-        item_ids = [item_ids[i:i+max_items] for i in range(0, len(item_ids), max_items)]
-        payloads = [{"itemIds": ids} for ids in item_ids]
-
-        # send parallel requests
-        urls_and_data = zip(repeat(self._items_url), payloads)
-        returns = parallelize_multiargs(self._delete, urls_and_data)
+        send = lambda ids: self._delete(self._items_url, {"itemIds": ids}, BULK)
+        chunk_size = min(chunk_size or self._max_items_per_request, self._max_items_per_request)  # API rule
 
-        # merge responses
-        for key in ['deletedItemIds', 'errors']:
-            data[key] = [item for resp in returns for item in resp[key]]
-
-        return data
+        return batch_request(send, item_ids, ['deletedItemIds'], chunk_size, threads, deadline, 
+            on_result = progress)
     
 
-    def get_items(self, offset: int = 0, limit: int = 100) -> dict[str, any]:
+    def get_items(self, offset: int = 0, limit: int = 100, priority: str = None) -> dict[str, any]:
         '''
         Fetch a list of items in this collection.
         Use the offset and limit parameters to control pagination. If you want to get all items in
@@ -159,16 +255,17 @@ class Collection(Entity):
         Args:
             offset (int, optional): number of items to skip. Defaults to 0.
             limit (int, optional): max number of items to return (capped at 100). Defaults to 100.
+            priority (str, optional): priority class of the request. Defaults to `priority`.
 
         Returns:
             dict[str, any]: group of items (index with the key `items` to get the actual data).
         '''
         url = self._items_url + f"?offset={offset}&limit={limit}"
 
-        return self._get(url)
+        return self._get(url, priority)
     
 
-    def get_all_items(self) -> list[dict]:
+    def get_all_items(self, deadline: float = None) -> list[dict]:
         '''
         Fetch all items in this collection.
         This is a convenient wrapper around the `get_items` method to automatically control pagination
@@ -176,16 +273,25 @@ class Collection(Entity):
         updated number of records in the collection; then uses that number to calculate the number 
         of pages and send the requests.
 
+        Args:
+            deadline (float, optional): max number of seconds for the whole operation; when it expires
+                pending requests are cancelled and `TimeoutError` is raised. Defaults to None.
+
         Returns:
             list[dict]: list of each item's data.
         '''
-        # update total number of items
+        # update total number of items (the deadline covers this request too)
         max_items = self._max_items_per_request  # API rule
-        initial_data = self._get(self._items_url)
-        total = initial_data['total']
+        start = time.monotonic()
+
+        with deadline_scope(deadline):
+            total = self._get(self._items_url, BULK)['total']
+
+        remaining = None if deadline is None else deadline - (time.monotonic() - start)
 
         # prepare one URL request for each offset in 0..total..limit
-        item_lists = parallelize(self.get_items, range(0, total, max_items))
+        get_items = partial(self.get_items, priority = BULK)
+        item_lists = parallelize(get_items, range(0, total, max_items), deadline = remaining)
         all_items = [item for item_list in item_lists for item in item_list['items']]
         
         return all_items
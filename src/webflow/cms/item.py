@@ -4,6 +4,8 @@ from collections import UserDict
 from ..utils import try_request
 from ..config import make_headers
 from ..entity import Entity
+from ..scheduler import INTERACTIVE
+from .schema import get_validator
 
 
 class Item(Entity):
@@ -37,6 +39,7 @@ class Item(Entity):
                 after hitting rate limits). Defaults to 50.
         '''
         super(Item, self).__init__(id, *args, **kwargs)
+        self.collection_id = collection_id
         self._url = f'https://api.webflow.com/collections/{collection_id}/items/{id}'
         self.data = self.get_data()
     
@@ -50,11 +53,11 @@ class Item(Entity):
         Returns:
             dict[str, any]: information about this item (name, slug, etc.).
         '''
-        self.data = self._get()['items'][0]
+        self.data = self._get(priority = INTERACTIVE)['items'][0]
         return self.data
 
 
-    def update(self, fields: dict[str,any], draft: bool = False) -> dict[str, str]:
+    def update(self, fields: dict[str,any], draft: bool = False, validate: bool = True) -> dict[str, str]:
         '''
         Update the item's data completely.
         This method will also update this object's data.
@@ -62,10 +65,19 @@ class Item(Entity):
         Args:
             fields (dict[str,any]): new object data.
             draft (bool, optional): draft changes (True) or stage for publish (False). Defaults to False.
+            validate (bool, optional): check and normalize the data locally first, against the
+                collection's schema. Defaults to True.
+
+        Raises:
+            ValidationError: if `validate` is set and the data is not valid.
 
         Returns:
             dict[str, str]: basic information about the updated item.
         '''
+        if validate:
+            # a missing slug must not be made up, as it would change the item's URL
+            fields = get_validator(self.collection_id).validate(fields, generate_slugs = False)
+
         payload = {'fields': {'_archived': False, '_draft': draft}}
         payload['fields'].update(fields)
 
@@ -75,7 +87,7 @@ class Item(Entity):
         return data
     
 
-    def patch(self, fields: dict[str,any], draft: bool = False) -> dict[str, str]:
+    def patch(self, fields: dict[str,any], draft: bool = False, validate: bool = True) -> dict[str, str]:
         '''
         Update the item's data partially.
         This method will also update this object's data.
@@ -83,10 +95,18 @@ class Item(Entity):
         Args:
             fields (dict[str,any]): new object data (only that which changes).
             draft (bool, optional): draft changes (True) or stage for publish (False). Defaults to False.
+            validate (bool, optional): check and normalize the data locally first, against the
+                collection's schema. Defaults to True.
+
+        Raises:
+            ValidationError: if `validate` is set and the data is not valid.
 
         Returns:
             dict[str, str]: basic information about the updated item.
         '''
+        if validate:
+            fields = get_validator(self.collection_id).validate(fields, partial = True)
+
         payload = {'fields': {'_archived': False, '_draft': draft}}
         payload['fields'].update(fields)
 
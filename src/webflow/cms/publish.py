@@ -0,0 +1,154 @@
+import threading
+import time
+from concurrent.futures import Future
+
+from ..scheduler import INTERACTIVE
+
+
+class PublishCoordinator:
+    """
+    A PublishCoordinator merges the publish requests of a site that arrive close to each other.
+
+    WebFlow throttles site publishes heavily. A request is sent right away if no other publish of the
+    site was sent in the last `debounce` seconds; otherwise it waits for the end of that window (and for 
+    the publish in flight, if any, to complete), and all requests received meanwhile are sent as a 
+    single publish to the union of their domains, with every caller getting the same future. The list of the site's domains (needed to publish to all of
+    them) is cached for `domains_ttl` seconds. One coordinator is shared by all `Site` objects with the
+    same ID (see `get_coordinator`); requests are sent through the `Site` that made the latest one.
+
+    Attributes:
+        site_id (str): ID of the site to publish.
+        domains_ttl (float): seconds the list of domains is cached for.
+    """
+
+    def __init__(self, site_id: str, domains_ttl: float = 300):
+        '''
+        Create a new PublishCoordinator object.
+
+        Args:
+            site_id (str): ID of the site to publish.
+            domains_ttl (float, optional): seconds the list of domains is cached for. Defaults to 300.
+        '''
+        self.site_id = site_id
+        self.domains_ttl = domains_ttl
+        self._domains = None
+        self._domains_time = 0
+        self._batch = None
+        self._in_flight = False
+        self._waiting = False
+        self._last_sent = None
+        self._lock = threading.Lock()
+
+
+    def get_domains(self, site: 'Site') -> list[str]:
+        '''
+        Get the names of the domains the site can be published to (cached).
+
+        Args:
+            site (Site): site to fetch the domains through, if they are not cached.
+
+        Returns:
+            list[str]: list of domain names.
+        '''
+        if self._domains is None or time.monotonic() - self._domains_time > self.domains_ttl:
+            self._domains = [domain['name'] for domain in site.get_domains(INTERACTIVE)]
+            self._domains_time = time.monotonic()
+
+        return self._domains
+
+
+    def publish(self, site: 'Site', domains: list[str] = None, debounce: float = 2.0) -> Future:
+        '''
+        Request to publish the site, merging the request with any other pending one.
+
+        Args:
+            site (Site): site object making the request (its credentials are used to send it).
+            domains (list[str], optional): domain URLs to publish to. Defaults to All.
+            debounce (float, optional): min seconds between two publishes of the site; requests made
+                sooner wait and are merged. Defaults to 2.0.
+
+        Returns:
+            Future: future of the API's response, shared by all merged requests.
+        '''
+        with self._lock:
+            if self._batch is None:
+                self._batch = {'domains': [], 'all': False, 'future': Future(), 'debounce': debounce}
+                idle = not self._in_flight and (self._last_sent is None or 
+                    time.monotonic() - self._last_sent >= debounce)
+                self._schedule(0 if idle else debounce)
+
+            self._batch['site'] = site
+
+            if domains:
+                self._batch['domains'] += [domain for domain in domains if domain not in self._batch['domains']]
+            else:
+                self._batch['all'] = True
+
+            return self._batch['future']
+
+
+    def _send(self) -> None:
+        '''
+        Publish the pending batch of requests.
+        '''
+        with self._lock:
+            # never send two publishes at once: the batch is scheduled again when the one in flight completes
+            if self._in_flight:
+                self._waiting = True
+                return
+
+            batch, self._batch = self._batch, None
+            self._in_flight = True
+            self._last_sent = time.monotonic()
+
+        future, site = batch['future'], batch['site']
+
+        try:
+            if future.set_running_or_notify_cancel():
+                domains = batch['domains']
+
+                if batch['all']:
+                    domains += [domain for domain in self.get_domains(site) if domain not in domains]
+
+                future.set_result(site._post(site._url + '/publish', {"domains": domains}, INTERACTIVE))
+        except Exception as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                self._in_flight = False
+                self._last_sent = time.monotonic()
+
+                if self._waiting:
+                    self._waiting = False
+                    self._schedule(self._batch['debounce'])
+
+
+    def _schedule(self, delay: float) -> None:
+        '''
+        Send the pending batch after `delay` seconds.
+        '''
+        timer = threading.Timer(delay, self._send)
+        timer.daemon = True
+        timer.start()
+
+
+_coordinators = {}
+_coordinators_lock = threading.Lock()
+
+
+def get_coordinator(site_id: str, *args, **kwargs) -> PublishCoordinator:
+    '''
+    Get the publish coordinator of a site, creating it if needed.
+    Arguments after `site_id` are only used to create a new coordinator (see `PublishCoordinator`).
+
+    Args:
+        site_id (str): ID of the site to publish.
+
+    Returns:
+        PublishCoordinator: the coordinator shared by all sites with the same ID.
+    '''
+    with _coordinators_lock:
+        if site_id not in _coordinators:
+            _coordinators[site_id] = PublishCoordinator(site_id, *args, **kwargs)
+
+        return _coordinators[site_id]
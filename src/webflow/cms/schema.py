@@ -0,0 +1,357 @@
+import re
+import threading
+
+from ..utils import slugify_all
+from ..entity import Entity
+
+
+_slug_pattern  = re.compile(r'^[a-z0-9_-]+$')
+_email_pattern = re.compile(r'^[^@\s]+@[^@\s]+\.[^@\s]+$')
+_color_pattern = re.compile(r'^#(?:[0-9a-fA-F]{3}){1,2}$')
+_id_pattern    = re.compile(r'^[0-9a-f]{24}$')
+
+
+class ValidationError(ValueError):
+    """
+    Raised when item data does not match its collection's schema.
+
+    Attributes:
+        errors (dict[int, dict[str, str]]): error message for each invalid field, for each invalid item
+            (indexed by its position in the validated list).
+    """
+
+    def __init__(self, errors: dict[int, dict[str, str]]):
+        self.errors = errors
+        lines = [f'item {i}, field "{field}": {message}' 
+            for i, fields in errors.items() for field, message in fields.items()]
+        super(ValidationError, self).__init__(f'{len(errors)} invalid item(s): ' + '; '.join(lines))
+
+
+class Validator:
+    """
+    A Validator checks and normalizes item data locally, before it is sent to the API.
+
+    Checks are compiled once from the collection's field schema (the `fields` of `Collection.get_data`),
+    and cover unknown and missing required fields, text length, slug format, option values, numbers,
+    emails, links, colors and references. Normalization converts option names to their IDs, numeric 
+    strings to numbers, drops read-only fields, and generates missing slugs from the items' names.
+    System fields (like `_archived` or `_draft`) are passed through unchecked, as they are set by the 
+    methods that send the data.
+
+    Attributes:
+        fields (dict[str, callable]): compiled check of each editable field, keyed by field slug.
+        required (set[str]): slugs of the required fields.
+        types (dict[str, str]): type of each editable field (e.g. `PlainText`), keyed by field slug.
+        readonly (set[str]): slugs of the fields that cannot be written (e.g. `created-on`).
+    """
+
+    def __init__(self, schema: list[dict[str, any]]):
+        '''
+        Create a new Validator object.
+
+        Args:
+            schema (list[dict[str, any]]): the collection's fields, as returned by the API.
+        '''
+        user = [field for field in schema if not field['slug'].startswith('_')]
+        editable = [field for field in user if field.get('editable', True)]
+        self.fields = {field['slug']: _compile(field) for field in editable}
+        self.required = {field['slug'] for field in editable if field.get('required')}
+        self.types = {field['slug']: field.get('type') for field in editable}
+        self.readonly = {field['slug'] for field in user if not field.get('editable', True)}
+
+        slug = next((field for field in editable if field['slug'] == 'slug'), {})
+        self._slug_length = (slug.get('validations') or {}).get('maxLength')
+
+
+    def validate(self, fields: dict[str, any], partial: bool = False, 
+            generate_slugs: bool = True) -> dict[str, any]:
+        '''
+        Check and normalize the data of one item.
+
+        Args:
+            fields (dict[str, any]): item data.
+            partial (bool, optional): `True` for partial updates (required fields may be missing). 
+                Defaults to False.
+            generate_slugs (bool, optional): generate a missing slug from the item's name (not wanted 
+                for existing items, whose URL would change). Defaults to True.
+
+        Raises:
+            ValidationError: if the data is not valid.
+
+        Returns:
+            dict[str, any]: normalized item data.
+        '''
+        return self.validate_all([fields], partial, generate_slugs = generate_slugs)[0]
+
+
+    def validate_all(self, fields_list: list[dict[str, any]], partial: bool = False, 
+            taken_slugs: set[str] = (), generate_slugs: bool = True) -> list[dict[str, any]]:
+        '''
+        Check and normalize the data of many items, reporting all errors at once.
+        Items without a slug get one generated from their name, unique within the list and `taken_slugs`.
+        Slugs are only checked for collisions within the list and `taken_slugs`, not against the items 
+        already in the collection.
+
+        Args:
+            fields_list (list[dict[str, any]]): list of item data.
+            partial (bool, optional): `True` for partial updates (required fields may be missing). 
+                Defaults to False.
+            taken_slugs (set[str], optional): slugs already in use in the collection. Defaults to ().
+            generate_slugs (bool, optional): generate missing slugs from the items' names. Defaults to True.
+
+        Raises:
+            ValidationError: if any item is not valid.
+
+        Returns:
+            list[dict[str, any]]: normalized data of each item.
+        '''
+        items, errors = [], {}
+
+        for i, fields in enumerate(fields_list):
+            item, item_errors = {}, {}
+
+            for key, value in fields.items():
+                if key.startswith('_'):
+                    item[key] = value
+                elif key in self.readonly:
+                    continue
+                elif key not in self.fields:
+                    item_errors[key] = 'unknown field'
+                elif value is None:
+                    item[key] = value
+                else:
+                    try:
+                        item[key] = self.fields[key](value)
+                    except ValueError as e:
+                        item_errors[key] = str(e)
+
+            items.append(item)
+
+            if item_errors:
+                errors[i] = item_errors
+
+        if not partial:
+            self._fill_slugs(items, errors, taken_slugs, generate_slugs)
+
+            for i, item in enumerate(items):
+                item_errors = errors.get(i, {})
+
+                # an invalid field, or the invalid name a slug is made from, is already reported
+                for key in self.required - set(item_errors):
+                    if item.get(key) in (None, '') and not (key == 'slug' and 'name' in item_errors):
+                        errors.setdefault(i, {})[key] = 'required field is missing'
+
+        if errors:
+            raise ValidationError(errors)
+
+        return items
+
+
+    def _fill_slugs(self, items: list[dict[str, any]], errors: dict[int, dict[str, str]], 
+            taken_slugs: set[str], generate: bool = True) -> None:
+        '''
+        Generate the missing slugs (if `generate` is set), and report duplicated ones.
+        Generated slugs go through the same checks as given ones, and are reported if a valid slug
+        cannot be made from the name.
+        '''
+        if 'slug' not in self.fields:
+            return
+
+        used = set(taken_slugs)
+
+        for i, item in enumerate(items):
+            if item.get('slug'):
+                if item['slug'] in used:
+                    errors.setdefault(i, {})['slug'] = f'slug "{item["slug"]}" is already in use'
+                used.add(item['slug'])
+
+        if not generate:
+            return
+
+        missing = [i for i, item in enumerate(items) if not item.get('slug') and item.get('name')]
+        slugs = slugify_all([items[i]['name'] for i in missing], used, self._slug_length)
+
+        for i, slug in zip(missing, slugs):
+            try:
+                items[i]['slug'] = self.fields['slug'](slug)
+            except ValueError as e:
+                errors.setdefault(i, {})['slug'] = f'no valid slug can be made from the name ({e})'
+
+
+def _compile(field: dict[str, any]) -> callable:
+    '''
+    Compile the check of one field from its schema.
+
+    Args:
+        field (dict[str, any]): the field's schema.
+
+    Returns:
+        callable: function that returns the normalized value, or raises `ValueError`.
+    '''
+    validations = field.get('validations') or {}
+    kind = field.get('type')
+    checks = []
+
+    if kind in ('PlainText', 'RichText', 'Email', 'Phone', 'Link', 'Color', 'Video'):
+        checks.append(_check_type(str, 'text'))
+
+        if 'maxLength' in validations:
+            checks.append(_check_max_length(validations['maxLength']))
+        if 'minLength' in validations:
+            checks.append(_check_min_length(validations['minLength']))
+        if validations.get('singleLine'):
+            checks.append(_check_pattern(re.compile(r'^[^\n]*$'), 'must be a single line'))
+
+    if field.get('slug') == 'slug':
+        checks.append(_check_pattern(_slug_pattern, 'slugs may only contain lowercase letters, numbers, "-" and "_"'))
+    elif kind == 'Email':
+        checks.append(_check_pattern(_email_pattern, 'not a valid email address'))
+    elif kind in ('Link', 'Video'):
+        checks.append(_check_pattern(re.compile(r'^https?://'), 'links must start with http:// or https://'))
+    elif kind == 'Color':
+        checks.append(_check_pattern(_color_pattern, 'not a valid hex color'))
+    elif kind == 'Number':
+        checks.append(_check_number(validations))
+    elif kind == 'Bool':
+        checks.append(_check_type(bool, 'boolean'))
+    elif kind == 'Option':
+        checks.append(_check_option(validations.get('options', [])))
+    elif kind == 'ItemRef':
+        checks.append(_check_pattern(_id_pattern, 'not a valid item ID'))
+    elif kind == 'ItemRefSet':
+        checks.append(_check_id_list)
+
+    def check(value: any) -> any:
+        for fn in checks:
+            value = fn(value)
+        return value
+
+    return check
+
+
+def _check_type(kind: type, name: str) -> callable:
+    def check(value):
+        if not isinstance(value, kind):
+            raise ValueError(f'expected a {name}, got {type(value).__name__}')
+        return value
+    return check
+
+
+def _check_max_length(max_length: int) -> callable:
+    def check(value):
+        if len(value) > max_length:
+            raise ValueError(f'longer than {max_length} characters')
+        return value
+    return check
+
+
+def _check_min_length(min_length: int) -> callable:
+    def check(value):
+        if len(value) < min_length:
+            raise ValueError(f'shorter than {min_length} characters')
+        return value
+    return check
+
+
+def _check_pattern(pattern: re.Pattern, message: str) -> callable:
+    def check(value):
+        if not isinstance(value, str) or not pattern.match(value):
+            raise ValueError(message)
+        return value
+    return check
+
+
+def _check_number(validations: dict[str, any]) -> callable:
+    integer = validations.get('format') == 'integer'
+
+    def check(value):
+        if isinstance(value, bool):
+            raise ValueError('expected a number, got bool')
+
+        try:
+            number = float(value)
+        except (TypeError, ValueError):
+            raise ValueError(f'expected a number, got {value!r}')
+
+        if integer:
+            if not number.is_integer():
+                raise ValueError('expected an integer')
+            number = int(number)
+
+        if validations.get('allowNegative') is False and number < 0:
+            raise ValueError('negative numbers are not allowed')
+        if validations.get('minValue') is not None and number < validations['minValue']:
+            raise ValueError(f'smaller than {validations["minValue"]}')
+        if validations.get('maxValue') is not None and number > validations['maxValue']:
+            raise ValueError(f'larger than {validations["maxValue"]}')
+
+        return number
+    return check
+
+
+def _check_option(options: list[dict[str, str]]) -> callable:
+    ids = {option['id'] for option in options}
+    names = {option['name']: option['id'] for option in options}
+
+    def check(value):
+        if value in ids:
+            return value
+        if value in names:
+            return names[value]
+        raise ValueError(f'{value!r} is not one of the options ({", ".join(names)})')
+    return check
+
+
+def _check_id_list(value: any) -> list[str]:
+    if not isinstance(value, list) or not all(isinstance(v, str) and _id_pattern.match(v) for v in value):
+        raise ValueError('expected a list of item IDs')
+    return value
+
+
+_validators = {}
+_validators_lock = threading.Lock()
+
+
+def get_validator(collection_id: str, schema: list[dict[str, any]] = None) -> Validator:
+    '''
+    Get the validator of a collection, compiling it if needed.
+    Validators are cached per collection, and compiled again when a different schema is given. If none 
+    is cached and no schema is given, the collection's schema is fetched from the API.
+
+    Args:
+        collection_id (str): ID field (often `_id`) of the collection.
+        schema (list[dict[str, any]], optional): the collection's fields. Defaults to None.
+
+    Returns:
+        Validator: the collection's validator.
+    '''
+    with _validators_lock:
+        cached = _validators.get(collection_id)
+
+    if cached is not None and (schema is None or cached[0] is schema or cached[0] == schema):
+        return cached[1]
+
+    # fetch without holding the lock, so other collections are not blocked by a slow request
+    if schema is None:
+        schema = Entity(collection_id)._get(f'https://api.webflow.com/collections/{collection_id}')['fields']
+
+    validator = Validator(schema)
+
+    with _validators_lock:
+        _validators[collection_id] = (schema, validator)
+
+    return validator
+
+
+def invalidate_validator(collection_id: str = None) -> None:
+    '''
+    Forget the cached validator of a collection, so that its schema is fetched again when next needed.
+
+    Args:
+        collection_id (str, optional): ID field (often `_id`) of the collection. Defaults to all collections.
+    '''
+    with _validators_lock:
+        if collection_id is None:
+            _validators.clear()
+        else:
+            _validators.pop(collection_id, None)
@@ -1,8 +1,14 @@
+import os
 import requests
 from collections import UserDict
+from concurrent.futures import Future
+from functools import partial
 
 from ..entity import Entity
-from ..utils import try_request
+from ..utils import try_request, parallelize, parallelize_multiargs
+from ..scheduler import BULK
+from .publish import get_coordinator
+from .asset import AssetCache, hash_file, upload_file
 
 
 def list_sites():
@@ -24,12 +30,14 @@ class Site(Entity):
         data (dict): dictionary representation of the site's data.
     """
 
-    def __init__(self, id: str, *args, **kwargs):
+    def __init__(self, id: str, *args, publish_debounce: float = 2.0, **kwargs):
         '''
         Create a new Site object.
 
         Args:
             site_id (str): ID field (often `_id`) of the site in the CMS.
+            publish_debounce (float, optional): min seconds between two publishes of the site; requests
+                made sooner wait and are merged into one (see `PublishCoordinator`). Defaults to 2.0.
             throttle_delay (float, optional): number of seconds to wait after a request hits the 
                 rate limit. Defaults to 10.
             max_retries (int, optional): number of times failed requests are retried (including 
@@ -37,6 +45,9 @@ class Site(Entity):
         '''
         super(Site, self).__init__(id, *args, **kwargs)
         self._url = f'https://api.webflow.com/sites/{id}'
+        self._assets_url = f'https://api.webflow.com/v2/sites/{id}/assets'
+        self.publish_debounce = publish_debounce
+        self._publisher = get_coordinator(id)
         self.data = self.get_data()
     
 
@@ -55,7 +66,10 @@ class Site(Entity):
     def publish(self, domains: list[str] = None) -> dict[str, bool]:
         '''
         Publish the website to any domain(s).
-        By default, the website is published to all associated domains.
+        By default, the website is published to all associated domains. The request is sent right away,
+        unless another publish of the same site was sent in the last `publish_debounce` seconds: then it
+        waits for the end of that window, merged with any other request made meanwhile into a single one
+        to the union of their domains. This method blocks until it is sent (see `publish_async`).
 
         Args:
             domains (list[str], optional): domain URLs to publish to. Defaults to All.
@@ -63,18 +77,34 @@ class Site(Entity):
         Returns:
             dict[str, bool]: `{'queued': True}` if successful, `{'queued': False}` otherwise
         '''
-        domains = domains or [domain['name'] for domain in self.get_domains()]
-        return self._post(self._url + '/publish', {"domains": domains})
+        return self.publish_async(domains).result()
+
+
+    def publish_async(self, domains: list[str] = None) -> Future:
+        '''
+        Publish the website to any domain(s), without waiting for it.
+        See `publish` for more information.
+
+        Args:
+            domains (list[str], optional): domain URLs to publish to. Defaults to All.
+
+        Returns:
+            Future: future of the `publish` response, shared by all merged requests.
+        '''
+        return self._publisher.publish(self, domains, self.publish_debounce)
     
 
-    def get_domains(self) -> list[dict[str, str]]:
+    def get_domains(self, priority: str = None) -> list[dict[str, str]]:
         '''
         Get a list of domains the site can be published to.
 
+        Args:
+            priority (str, optional): priority class of the request. Defaults to `priority`.
+
         Returns:
             list[dict[str, str]]: list of `{'id': id, 'name': name}` dictionaries.
         '''
-        return self._get(self._url + '/domains')
+        return self._get(self._url + '/domains', priority)
 
 
     def get_collections(self) -> list[dict[str, any]]:
@@ -84,4 +114,83 @@ class Site(Entity):
         Returns:
             list[dict[str, any]]: list of collections with some basic data.
         '''
-        return self._get(self._url + '/collections')
\ No newline at end of file
+        return self._get(self._url + '/collections')
+
+
+    def upload_asset(self, path: str, cache: AssetCache = None) -> str:
+        '''
+        Upload a file to the site's assets, unless the same content was already uploaded.
+        See `upload_assets` for more information.
+
+        Args:
+            path (str): path of the file.
+            cache (AssetCache, optional): cache of uploaded files. Defaults to the user's cache file.
+
+        Returns:
+            str: URL of the asset, ready to use in an item's image or file field.
+        '''
+        return self.upload_assets([path], cache)[0]
+
+
+    def upload_assets(self, paths: list[str], cache: AssetCache = None, threads: int = 8) -> list[str]:
+        '''
+        Upload files to the site's assets in parallel, skipping those already uploaded.
+        Files are identified by the MD5 hash of their content (computed without loading them in memory),
+        so the same file is uploaded only once, even under different names or across runs. Each upload
+        asks the API for a presigned upload target, then sends the file there directly.
+
+        Args:
+            paths (list[str]): paths of the files.
+            cache (AssetCache, optional): cache of uploaded files. Defaults to the user's cache file.
+            threads (int, optional): number of parallel hashes and uploads. Defaults to 8.
+
+        Raises:
+            Exception: the error of the first failed upload (the successful ones are cached anyway).
+
+        Returns:
+            list[str]: URL of each asset (in the same order as `paths`), ready to use in items' image 
+                or file fields (e.g. with `Collection.post_items`).
+        '''
+        cache = cache or AssetCache()
+        hashes = parallelize(hash_file, paths, threads)
+
+        # one upload per new content
+        pending = {}
+
+        for path, file_hash in zip(paths, hashes):
+            if cache.get(self.id, file_hash) is None:
+                pending.setdefault(file_hash, path)
+
+        errors = parallelize_multiargs(partial(self._upload_asset, cache), pending.items(), threads)
+
+        # save once, keeping the successful uploads even if some failed
+        cache.save()
+
+        for error in errors:
+            if error is not None:
+                raise error
+
+        return [cache.get(self.id, file_hash) for file_hash in hashes]
+
+
+    def _upload_asset(self, cache: AssetCache, file_hash: str, path: str) -> Exception:
+        '''
+        Create an asset, upload the file's content to it, and add its URL to the cache.
+
+        Returns:
+            Exception: the error if the upload failed, `None` otherwise.
+        '''
+        try:
+            payload = {'fileName': os.path.basename(path), 'fileHash': file_hash}
+            asset = self._post(self._assets_url, payload, BULK)
+            url = asset.get('hostedUrl') or asset.get('assetUrl') or asset.get('url')
+
+            # without a URL the asset cannot be used, nor found again in the cache
+            if not url:
+                raise ValueError(f'The API returned no URL for the asset of "{path}".')
+
+            upload_file(asset['uploadUrl'], asset.get('uploadDetails', {}), path)
+        except Exception as e:
+            return e
+
+        cache.put(self.id, file_hash, url)
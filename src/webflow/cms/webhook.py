@@ -0,0 +1,294 @@
+import hmac
+import hashlib
+import threading
+import time
+from wsgiref.simple_server import make_server, WSGIRequestHandler
+
+from ..utils import string_to_dict
+from .cache import ItemCache
+
+
+ITEM_CREATED  = 'collection_item_created'
+ITEM_CHANGED  = 'collection_item_changed'
+ITEM_DELETED  = 'collection_item_deleted'
+SITE_PUBLISH  = 'site_publish'
+TRIGGER_TYPES = (ITEM_CREATED, ITEM_CHANGED, ITEM_DELETED, SITE_PUBLISH)
+
+
+def verify_signature(secret: str, body: bytes, timestamp: str, signature: str, 
+        tolerance: float = 300) -> bool:
+    '''
+    Verify the signature of a request sent by WebFlow.
+    WebFlow signs each webhook with an HMAC-SHA256 of `"{timestamp}:{body}"`, keyed by the webhook's
+    secret, and sends it in the `x-webflow-signature` header (with the timestamp, in milliseconds,
+    in `x-webflow-timestamp`).
+
+    Args:
+        secret (str): the webhook's secret key.
+        body (bytes): raw body of the request.
+        timestamp (str): value of the `x-webflow-timestamp` header.
+        signature (str): value of the `x-webflow-signature` header.
+        tolerance (float, optional): max age of the request in seconds, to prevent replays. Defaults to 300.
+
+    Returns:
+        bool: `True` if the request is authentic and recent, `False` otherwise.
+    '''
+    if not timestamp or not signature:
+        return False
+
+    try:
+        age = abs(time.time() - int(timestamp) / 1000)
+    except ValueError:
+        return False
+
+    if age > tolerance:
+        return False
+
+    message = timestamp.encode() + b':' + body
+    expected = hmac.new(secret.encode(), message, hashlib.sha256).hexdigest()
+
+    return hmac.compare_digest(expected, signature)
+
+
+class WebhookReceiver:
+    """
+    A WebhookReceiver applies WebFlow's webhook events to local item caches.
+
+    The object is a WSGI application (and exposes an ASGI one through `asgi`), so it can be embedded
+    in any web server; `serve` runs it standalone. Item events (created, changed, deleted) are applied
+    to the registered `ItemCache` of the relevant collection, while any event can be handled by custom
+    callbacks (see `on`). The trigger type is read from the payload's `triggerType` if present, or
+    else from the last segment of the request path (e.g. `POST /collection_item_changed`).
+    Requests must be signed with the webhooks' secret, unless verification is explicitly disabled.
+
+    Attributes:
+        secret (str): the webhooks' secret key.
+        verify (bool): whether signatures are verified.
+        caches (dict[str, ItemCache]): registered caches, keyed by collection ID.
+    """
+
+    def __init__(self, secret: str = None, caches: list[ItemCache] = None, verify: bool = True):
+        '''
+        Create a new WebhookReceiver object.
+
+        Args:
+            secret (str, optional): the webhooks' secret key; required unless `verify` is False. 
+                Defaults to None.
+            caches (list[ItemCache], optional): item caches to keep up to date. Defaults to None.
+            verify (bool, optional): verify the signature of each request. Only disable it for testing,
+                as anyone could then write to the caches. Defaults to True.
+
+        Raises:
+            ValueError: if `verify` is set but no secret is given.
+        '''
+        if verify and not secret:
+            raise ValueError('A webhook secret is required to verify requests (or pass `verify = False`).')
+
+        self.secret = secret
+        self.verify = verify
+        self.caches = {}
+        self._callbacks = {trigger: [] for trigger in TRIGGER_TYPES}
+
+        for cache in caches or []:
+            self.register(cache)
+
+
+    def register(self, cache: ItemCache) -> None:
+        '''
+        Keep an item cache up to date with the received events.
+
+        Args:
+            cache (ItemCache): cache to update.
+        '''
+        self.caches[cache.collection_id] = cache
+
+
+    def on(self, trigger: str, callback: callable) -> None:
+        '''
+        Call a function every time an event is received.
+        Callbacks are called with the event's payload, after the caches have been updated.
+
+        Args:
+            trigger (str): trigger type, one of `TRIGGER_TYPES`.
+            callback (callable): function accepting the payload dictionary.
+        '''
+        if trigger not in self._callbacks:
+            raise ValueError(f'Unknown trigger type "{trigger}".')
+
+        self._callbacks[trigger].append(callback)
+
+
+    def handle(self, path: str, body: bytes, headers: dict[str, str]) -> int:
+        '''
+        Process a webhook request.
+
+        Args:
+            path (str): path of the request.
+            body (bytes): raw body of the request.
+            headers (dict[str, str]): request headers, with lowercase names.
+
+        Returns:
+            int: HTTP status code to answer with.
+        '''
+        if self.verify:
+            timestamp = headers.get('x-webflow-timestamp')
+            signature = headers.get('x-webflow-signature')
+
+            if not verify_signature(self.secret, body, timestamp, signature):
+                return 401
+
+        try:
+            payload = string_to_dict(body)
+        except ValueError:
+            return 400
+
+        if not isinstance(payload, dict):
+            return 400
+
+        # v2 webhooks wrap the data in an envelope
+        trigger = payload.get('triggerType') or path.rstrip('/').rsplit('/', 1)[-1]
+        payload = payload.get('payload', payload)
+
+        if trigger not in self._callbacks:
+            return 404
+
+        if not isinstance(payload, dict) or not self._apply(trigger, payload):
+            return 400
+
+        for callback in self._callbacks[trigger]:
+            callback(payload)
+
+        return 200
+
+
+    def _apply(self, trigger: str, payload: dict[str, any]) -> bool:
+        '''
+        Apply an item event to the relevant cache(s).
+
+        Args:
+            trigger (str): trigger type.
+            payload (dict[str, any]): the event's data.
+
+        Returns:
+            bool: `False` if the payload of an item event does not identify the item, `True` otherwise.
+        '''
+        if trigger in (ITEM_CREATED, ITEM_CHANGED):
+            item = _to_item(payload)
+
+            if not item.get('_id'):
+                return False
+
+            cache = self.caches.get(item.get('_cid'))
+
+            if cache is not None:
+                cache.apply(item)
+
+        elif trigger == ITEM_DELETED:
+            item_id = payload.get('itemId') or payload.get('_id') or payload.get('id')
+            collection_id = payload.get('_cid') or payload.get('collectionId')
+
+            if not item_id:
+                return False
+
+            caches = [self.caches[collection_id]] if collection_id in self.caches else self.caches.values()
+
+            for cache in caches:
+                cache.discard(item_id)
+
+        return True
+
+
+    def __call__(self, environ: dict, start_response: callable) -> list[bytes]:
+        '''
+        WSGI entry point.
+        '''
+        if environ['REQUEST_METHOD'] != 'POST':
+            status = 405
+        else:
+            length = int(environ.get('CONTENT_LENGTH') or 0)
+            body = environ['wsgi.input'].read(length)
+            headers = {key[5:].replace('_', '-').lower(): value 
+                for key, value in environ.items() if key.startswith('HTTP_')}
+            status = self.handle(environ.get('PATH_INFO', '/'), body, headers)
+
+        start_response(_STATUS_LINES[status], [('Content-Type', 'text/plain')])
+        return [_STATUS_LINES[status].encode()]
+
+
+    async def asgi(self, scope: dict, receive: callable, send: callable) -> None:
+        '''
+        ASGI entry point.
+        '''
+        if scope['type'] != 'http':
+            return
+
+        body = b''
+        more_body = True
+
+        while more_body:
+            message = await receive()
+            body += message.get('body', b'')
+            more_body = message.get('more_body', False)
+
+        if scope['method'] != 'POST':
+            status = 405
+        else:
+            headers = {key.decode().lower(): value.decode() for key, value in scope['headers']}
+            status = self.handle(scope['path'], body, headers)
+
+        await send({'type': 'http.response.start', 'status': status,
+            'headers': [(b'content-type', b'text/plain')]})
+        await send({'type': 'http.response.body', 'body': _STATUS_LINES[status].encode()})
+
+
+    def serve(self, host: str = '0.0.0.0', port: int = 8000, blocking: bool = True) -> any:
+        '''
+        Run the receiver as a standalone HTTP server.
+
+        Args:
+            host (str, optional): interface to listen on. Defaults to '0.0.0.0'.
+            port (int, optional): port to listen on (0 picks a free one). Defaults to 8000.
+            blocking (bool, optional): if `True` serves forever; if `False` serves from a background 
+                thread and returns immediately. Defaults to True.
+
+        Returns:
+            any: the server object (call `shutdown()` on it to stop a non-blocking server).
+        '''
+        server = make_server(host, port, self, handler_class = _QuietHandler)
+
+        if blocking:
+            server.serve_forever()
+        else:
+            threading.Thread(target = server.serve_forever, daemon = True).start()
+
+        return server
+
+
+def _to_item(payload: dict[str, any]) -> dict[str, any]:
+    '''
+    Convert an item event's payload to the item format used by the v1 API.
+    '''
+    if not isinstance(payload.get('fieldData'), dict):
+        return payload
+
+    item = dict(payload['fieldData'])
+    item['_id'] = payload.get('id')
+    item['_cid'] = payload.get('collectionId')
+    item['_archived'] = payload.get('isArchived', False)
+    item['_draft'] = payload.get('isDraft', False)
+
+    return item
+
+
+class _QuietHandler(WSGIRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+_STATUS_LINES = {
+    200: '200 OK',
+    400: '400 Bad Request',
+    401: '401 Unauthorized',
+    404: '404 Not Found',
+    405: '405 Method Not Allowed',
+}
@@ -1,9 +1,15 @@
 import requests
 import time
 from collections import UserDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout, wait, FIRST_COMPLETED
 
-from .utils import string_to_dict
+from .utils import string_to_dict, get_deadline, LatencyTracker
 from .config import make_headers
+from .scheduler import get_scheduler, NORMAL
+
+
+_get_latency = LatencyTracker()
+_hedge_pool = ThreadPoolExecutor(max_workers = 64)
 
 
 class Entity(UserDict):
@@ -17,10 +23,15 @@ class Entity(UserDict):
         id (str): ID field (`_id` throught the API Docs) of the entity.
         delay (float): number of seconds to wait after a request hits the rate limit.
         max_retries (int): number of times failed requests are retried (including after hitting rate limits).
+        timeout_retries (int): number of times GET requests that time out (or fail to connect) are retried.
+        priority (str): default priority class of the entity's requests (see `RequestScheduler`).
+        timeout (tuple[float, float]): connect and read timeouts of each request, in seconds.
+        hedge (bool): send a second GET request if the first is slower than 95% of recent ones.
         data (dict): dictionary representation of the entity's data.
     """
 
-    def __init__(self, id: str, max_retries: int = 50, throttle_delay: int = 10):
+    def __init__(self, id: str, max_retries: int = 50, throttle_delay: int = 10, priority: str = NORMAL,
+            timeout: tuple[float, float] = (5, 30), hedge: bool = False, timeout_retries: int = 3):
         '''
         Create a new Entity object.
 
@@ -30,119 +41,245 @@ class Entity(UserDict):
                 after hitting rate limits). Defaults to 50.
             throttle_delay (float, optional): number of seconds to wait after a request hits the 
                 rate limit. Defaults to 10.
+            priority (str, optional): default priority class of the entity's requests, one of 
+                'interactive', 'normal', or 'bulk'. Defaults to 'normal'.
+            timeout (tuple[float, float], optional): connect and read timeouts of each request, in 
+                seconds. Defaults to (5, 30).
+            hedge (bool, optional): send a second GET request if the first is slower than 95% of recent
+                ones, and use whichever answers first. Hedges only use spare rate limit. Defaults to False.
+            timeout_retries (int, optional): number of times GET requests that time out (or fail to 
+                connect) are retried, waiting longer each time; at most `max_retries`. Defaults to 3.
         '''
         self.id = id
         self.delay = throttle_delay
         self.max_retries = max_retries
+        self.priority = priority
+        self.timeout = timeout
+        self.hedge = hedge
+        self.timeout_retries = timeout_retries
         self._headers = make_headers()
     
 
-    def _request(self, request_fn: callable, url: str = None, data: dict = None) -> any:
+    def _request(self, request_fn: callable, url: str = None, data: dict = None, priority: str = None) -> any:
         '''
         Default request method for the item object.
         The returned value, if the call is successful, is either a dictionary or a list of dictionaries,
-        always parsed from the JSON in the API's response.
+        always parsed from the JSON in the API's response. Each attempt waits for its turn in the shared
+        `RequestScheduler`, and hitting the rate limit pauses all requests for `delay` seconds.
+        GET requests that time out are retried up to `timeout_retries` times, with an exponential backoff;
+        other requests are not, as they may have been applied.
 
         Args:
             request_fn (callable): function to call (one of requests.get/put/post/delete).
             url (str, optional): specify to use a different URL than the default one. Defaults to `_url`.
             data (dict, optional): optional JSON data to ship with the request. Defaults to None.
+            priority (str, optional): priority class of the request. Defaults to `priority`.
 
         Returns:
             any: whatever the response is, if valid, and always a dictionary or list of dictinaries.
         '''
-        current_try = 0
+        current_try = timeouts = 0
         url = url or self._url
+        priority = priority or self.priority
 
         if not url:
             raise NotImplementedError('Class must set the `_url` field upon instantiation, or have a URL passed.')
 
         # loop until either: 
         while True:
-            response = request_fn(url, json = data, headers = self._headers)
+            get_scheduler().acquire(priority)
+            timeout = self._timeout()
+
+            try:
+                if self.hedge and request_fn is requests.get:
+                    response = self._hedged_get(url, timeout)
+                else:
+                    response = self._send(request_fn, url, data, timeout)
+
+            except (requests.Timeout, requests.ConnectionError):
+                if request_fn is not requests.get or timeouts >= min(self.timeout_retries, self.max_retries):
+                    raise
+
+                timeouts += 1
+                self._backoff(timeouts)
+                continue
 
             # TRY AGAIN; hit API limit
             if response.status_code == 429:
                 if current_try < self.max_retries: 
-                    time.sleep(self.delay)
+                    get_scheduler().penalize(self.delay)
                     current_try += 1
                 else:
-                    raise 
+                    response.raise_for_status()
             
-            # SUCCESS; return the result
-            elif response.status_code == 200:
-                return string_to_dict(response.text)
+            # SUCCESS; return the result (some endpoints answer 201/202/204)
+            elif 200 <= response.status_code < 300:
+                return string_to_dict(response.text) if response.text else {}
 
             # ERROR; return it
             else:
                 response.raise_for_status()
 
     
-    def _get(self, url: str = None) -> any:
+    def _timeout(self) -> any:
+        '''
+        Timeouts for the next request, capped to the time left before the current deadline (if any).
+
+        Raises:
+            TimeoutError: if the deadline has already expired.
+
+        Returns:
+            any: timeouts in the format accepted by `requests`.
+        '''
+        deadline = get_deadline()
+
+        if deadline is None:
+            return self.timeout
+
+        remaining = deadline - time.monotonic()
+
+        if remaining <= 0:
+            raise TimeoutError('Deadline expired before the request could be sent.')
+
+        if self.timeout is None:
+            return remaining
+
+        if isinstance(self.timeout, tuple):
+            return tuple(min(timeout, remaining) for timeout in self.timeout)
+
+        return min(self.timeout, remaining)
+
+
+    def _backoff(self, attempt: int) -> None:
+        '''
+        Wait before retrying a request that timed out: 0.5s, 1s, 2s, ... (never past the current deadline).
+        '''
+        delay = 0.5 * 2 ** (attempt - 1)
+        deadline = get_deadline()
+
+        if deadline is not None:
+            delay = min(delay, max(deadline - time.monotonic(), 0))
+
+        time.sleep(delay)
+
+
+    def _send(self, request_fn: callable, url: str, data: dict, timeout: any) -> requests.Response:
+        '''
+        Send a single request, keeping track of the latency of GET requests.
+        '''
+        start = time.monotonic()
+        response = request_fn(url, json = data, headers = self._headers, timeout = timeout)
+
+        if request_fn is requests.get:
+            _get_latency.record(time.monotonic() - start)
+
+        return response
+
+
+    def _hedged_get(self, url: str, timeout: any) -> requests.Response:
+        '''
+        Send a GET request, and a second identical one if the first is slower than 95% of recent ones.
+        The second request is only sent if the rate limit has spare capacity.
+
+        Returns:
+            requests.Response: the first successful response.
+        '''
+        first = _hedge_pool.submit(self._send, requests.get, url, None, timeout)
+        delay = _get_latency.percentile(95)
+
+        if delay is None:
+            return first.result()
+
+        try:
+            return first.result(timeout = delay)
+        except FutureTimeout:
+            pass
+
+        if not get_scheduler().try_acquire():
+            return first.result()
+
+        pending = {first, _hedge_pool.submit(self._send, requests.get, url, None, timeout)}
+
+        while pending:
+            done, pending = wait(pending, return_when = FIRST_COMPLETED)
+
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+
+        return first.result()
+
+
+    def _get(self, url: str = None, priority: str = None) -> any:
         '''
         Wrapper for the GET method.
 
         Args:
             url (str, optional): fully formed url to connect to. Defaults to `_url`.
+            priority (str, optional): priority class of the request. Defaults to `priority`.
 
         Returns:
             any: if there are no errors, returns a dict or list of dicts parsed from the JSON response.
         '''
-        return self._request(requests.get, url)
+        return self._request(requests.get, url, priority = priority)
 
 
-    def _put(self, url: str = None, payload: dict = None) -> any:
+    def _put(self, url: str = None, payload: dict = None, priority: str = None) -> any:
         '''
         Wrapper for the PUT method.
 
         Args:
             url (str, optional): fully formed url to connect to. Defaults to `_url`.
             payload (dict, optional): optional data to send along the request as JSON. Defaults to None.
+            priority (str, optional): priority class of the request. Defaults to `priority`.
 
         Returns:
             any: if there are no errors, returns a dict or list of dicts parsed from the JSON response.
         '''
-        return self._request(requests.put, url, payload)
+        return self._request(requests.put, url, payload, priority)
 
 
-    def _post(self, url: str = None, payload: dict = None) -> any:
+    def _post(self, url: str = None, payload: dict = None, priority: str = None) -> any:
         '''
         Wrapper for the POST method.
 
         Args:
             url (str, optional): fully formed url to connect to. Defaults to `_url`.
             payload (dict, optional): optional data to send along the request as JSON. Defaults to None.
+            priority (str, optional): priority class of the request. Defaults to `priority`.
 
         Returns:
             any: if there are no errors, returns a dict or list of dicts parsed from the JSON response.
         '''
-        return self._request(requests.post, url, payload)
+        return self._request(requests.post, url, payload, priority)
 
 
-    def _patch(self, url: str = None, payload: dict = None) -> any:
+    def _patch(self, url: str = None, payload: dict = None, priority: str = None) -> any:
         '''
         Wrapper for the PATCH method.
 
         Args:
             url (str, optional): fully formed url to connect to. Defaults to `_url`.
             payload (dict, optional): optional data to send along the request as JSON. Defaults to None.
+            priority (str, optional): priority class of the request. Defaults to `priority`.
 
         Returns:
             any: if there are no errors, returns a dict or list of dicts parsed from the JSON response.
         '''
-        return self._request(requests.patch, url, payload)
+        return self._request(requests.patch, url, payload, priority)
 
 
-    def _delete(self, url: str = None, payload: dict = None) -> any:
+    def _delete(self, url: str = None, payload: dict = None, priority: str = None) -> any:
         '''
         Wrapper for the DELETE method.
 
         Args:
             url (str, optional): fully formed url to connect to. Defaults to `_url`.
             payload (dict, optional): optional data to send along the request as JSON. Defaults to None.
+            priority (str, optional): priority class of the request. Defaults to `priority`.
 
         Returns:
             any: if there are no errors, returns a dict or list of dicts parsed from the JSON response.
         '''
-        return self._request(requests.delete, url, payload)
+        return self._request(requests.delete, url, payload, priority)
 
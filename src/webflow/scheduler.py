@@ -0,0 +1,207 @@
+import threading
+import time
+from collections import deque
+
+from .utils import get_deadline
+
+
+INTERACTIVE = 'interactive'
+NORMAL      = 'normal'
+BULK        = 'bulk'
+
+
+class RequestScheduler:
+    """
+    A RequestScheduler shares the API's rate limit between classes (lanes) of requests.
+
+    Every request must `acquire` a slot before being sent. Slots are handed out by a token bucket that
+    refills at `rate_limit` requests every `period` seconds; when requests of several priority classes
+    are waiting, each class gets a fair share of the slots proportional to its weight in `shares`, so 
+    that a few interactive requests skip ahead of thousands of queued bulk ones, while a bulk job 
+    running alone still uses the whole budget. Within a class, requests are served first-come first-served.
+
+    Attributes:
+        rate_limit (int): requests allowed per period, or `None` for no limit.
+        period (float): length of the rate limit's window, in seconds.
+        burst (int): max number of requests that can be sent at once after a quiet time.
+        shares (dict[str, float]): relative weight of each priority class.
+        stats (dict[str, int]): number of `requests` sent and of `throttled` ones (hitting the limit anyway).
+    """
+
+    def __init__(self, rate_limit: int = 60, period: float = 60, burst: int = None, 
+            shares: dict[str, float] = None):
+        '''
+        Create a new RequestScheduler object.
+
+        Args:
+            rate_limit (int, optional): requests allowed per period, `None` for no limit. Defaults to 60.
+            period (float, optional): length of the rate limit's window, in seconds. Defaults to 60.
+            burst (int, optional): max number of requests sent at once. Defaults to `rate_limit`.
+            shares (dict[str, float], optional): relative weight of each priority class. Defaults to 
+                `{'interactive': 8, 'normal': 3, 'bulk': 1}`.
+        '''
+        self.rate_limit = rate_limit
+        self.period = period
+        self.burst = burst or rate_limit
+        self.shares = shares or {INTERACTIVE: 8, NORMAL: 3, BULK: 1}
+        self.stats = {'requests': 0, 'throttled': 0}
+
+        self._tokens = self.burst
+        self._last_refill = time.monotonic()
+        self._paused_until = 0
+        self._lanes = {lane: deque() for lane in self.shares}
+        self._passes = {lane: 0. for lane in self.shares}
+        self._virtual_time = 0.
+        self._condition = threading.Condition()
+
+
+    def acquire(self, priority: str = NORMAL) -> None:
+        '''
+        Wait until a request of the given priority class can be sent.
+        If the calling thread runs under a deadline (see `parallelize`), the request is dropped from
+        the queue once the deadline expires.
+
+        Args:
+            priority (str, optional): priority class of the request. Defaults to NORMAL.
+
+        Raises:
+            TimeoutError: if the deadline expires before the request can be sent.
+        '''
+        if priority not in self._lanes:
+            raise ValueError(f'Unknown priority class "{priority}".')
+
+        ticket = object()
+        deadline = get_deadline()
+
+        with self._condition:
+            lane = self._lanes[priority]
+
+            # an idle class cannot bank the shares it did not use
+            if not lane:
+                self._passes[priority] = max(self._passes[priority], self._virtual_time)
+
+            lane.append(ticket)
+
+            while True:
+                wait = self._wait_time()
+
+                if wait <= 0 and self._next_lane() == priority and lane[0] is ticket:
+                    lane.popleft()
+                    self._virtual_time = self._passes[priority]
+                    self._passes[priority] += 1 / self.shares[priority]
+                    self.stats['requests'] += 1
+
+                    if self.rate_limit:
+                        self._tokens -= 1
+
+                    self._condition.notify_all()
+                    return
+
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+
+                    if remaining <= 0:
+                        lane.remove(ticket)
+                        self._condition.notify_all()
+                        raise TimeoutError('Deadline expired while waiting for the rate limit.')
+
+                    wait = min(wait, remaining) if wait > 0 else remaining
+
+                self._condition.wait(wait if wait > 0 else None)
+
+
+    def try_acquire(self) -> bool:
+        '''
+        Take a slot only if one is free right now and no other request is waiting for it.
+        Useful for optional requests (like hedged reads) that should only use spare capacity.
+
+        Returns:
+            bool: `True` if the request can be sent, `False` otherwise.
+        '''
+        with self._condition:
+            if self._wait_time() > 0 or any(self._lanes.values()):
+                return False
+
+            self.stats['requests'] += 1
+
+            if self.rate_limit:
+                self._tokens -= 1
+
+            return True
+
+
+    def penalize(self, delay: float) -> None:
+        '''
+        Pause all lanes after a request hit the rate limit anyway.
+
+        Args:
+            delay (float): seconds to wait before sending any other request.
+        '''
+        with self._condition:
+            self.stats['throttled'] += 1
+            self._paused_until = max(self._paused_until, time.monotonic() + delay)
+
+            if self.rate_limit:
+                self._tokens = min(self._tokens, 0)
+
+
+    def _wait_time(self) -> float:
+        '''
+        Seconds until the next request can be sent (zero or less if it can be sent now).
+        '''
+        now = time.monotonic()
+
+        if self._paused_until > now:
+            return self._paused_until - now
+
+        if not self.rate_limit:
+            return 0
+
+        rate = self.rate_limit / self.period
+        self._tokens = min(self.burst, self._tokens + (now - self._last_refill) * rate)
+        self._last_refill = now
+
+        return (1 - self._tokens) / rate
+
+
+    def _next_lane(self) -> str:
+        '''
+        Priority class that is entitled to the next slot, among those with waiting requests.
+        '''
+        waiting = [lane for lane in self._lanes if self._lanes[lane]]
+        return min(waiting, key = lambda lane: self._passes[lane])
+
+
+_scheduler = RequestScheduler()
+
+
+def get_scheduler() -> RequestScheduler:
+    '''
+    Get the scheduler shared by all requests to the API.
+
+    Returns:
+        RequestScheduler: the shared scheduler.
+    '''
+    return _scheduler
+
+
+def set_rate_limit(rate_limit: int, period: float = 60, burst: int = None, 
+        shares: dict[str, float] = None) -> RequestScheduler:
+    '''
+    Replace the scheduler shared by all requests to the API.
+    WebFlow allows 60 requests per minute on most plans (120 on CMS and Business plans).
+
+    Args:
+        rate_limit (int): requests allowed per period, `None` for no limit.
+        period (float, optional): length of the rate limit's window, in seconds. Defaults to 60.
+        burst (int, optional): max number of requests sent at once. Defaults to `rate_limit`.
+        shares (dict[str, float], optional): relative weight of each priority class. Defaults to 
+            `{'interactive': 8, 'normal': 3, 'bulk': 1}`.
+
+    Returns:
+        RequestScheduler: the new shared scheduler.
+    '''
+    global _scheduler
+
+    _scheduler = RequestScheduler(rate_limit, period, burst, shares)
+    return _scheduler
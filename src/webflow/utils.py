@@ -1,7 +1,16 @@
 import json
+import re
+import requests
+import threading
 import time
 import unicodedata
-from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, wait
+
+
+_local = threading.local()
+_BISECT_STATUSES = {400, 409, 422}
 
 
 def string_to_dict(string: str) -> dict:
@@ -29,18 +38,103 @@ def slugify(txt: str) -> str:
     Returns:
         str: equivalent slug string
     '''
-    # remove accents
-    nfkd = unicodedata.normalize('NFKD', txt)
-    txt = u''.join([c for c in nfkd if not unicodedata.combining(c)])
+    # remove accents, and other characters not allowed in slugs (only ASCII letters, numbers and "-")
+    nfkd = unicodedata.normalize('NFKD', txt.casefold())
+    txt = nfkd.encode('ascii', 'ignore').decode('ascii')
 
     # normalize
-    txt = ''.join([c for c in txt if c.isalnum() or c == ' '])
-    txt = txt.replace(' ', '-').lower()
+    txt = re.sub(r'[^a-z0-9]+', '-', txt).strip('-')
 
     return txt
 
 
-def parallelize(function: callable, data: list[any], threads: int = 50, await_completion: bool = True) -> list[any]:
+def slugify_all(texts: list[str], taken: set[str] = (), max_length: int = None) -> list[str]:
+    '''
+    Generate unique slugs for a list of strings.
+    Each slug is made with `slugify`; slugs that collide with one already generated, or with one in
+    `taken`, get a numeric suffix (`name`, `name-2`, `name-3`, ...).
+
+    Args:
+        texts (list[str]): strings to convert.
+        taken (set[str], optional): slugs already in use (e.g. by items in the collection). Defaults to ().
+        max_length (int, optional): max length of each slug, suffix included. Defaults to None.
+
+    Returns:
+        list[str]: one unique slug per string.
+    '''
+    used = set(taken)
+    slugs = []
+
+    for text in texts:
+        base = slugify(text)[:max_length].rstrip('-')
+        slug, suffix = base, 2
+
+        while slug in used:
+            end = f'-{suffix}'
+            slug = base[:max_length - len(end) if max_length else None].rstrip('-') + end
+            suffix += 1
+
+        used.add(slug)
+        slugs.append(slug)
+
+    return slugs
+
+
+def get_deadline() -> float:
+    '''
+    Get the deadline of the operation running in the current thread, if any (see `parallelize`).
+
+    Returns:
+        float: deadline as a `time.monotonic()` timestamp, or `None` if there is none.
+    '''
+    return getattr(_local, 'deadline', None)
+
+
+@contextmanager
+def deadline_scope(deadline: float = None):
+    '''
+    Context manager that runs the requests made in its block, in the current thread, under a deadline 
+    (like those made by `parallelize`). Requests' timeouts are capped to the time left, and no request is
+    sent after the deadline expires. A deadline already running in the thread is kept if it is earlier.
+
+    Args:
+        deadline (float, optional): max number of seconds for the block; `None` for no deadline. 
+            Defaults to None.
+
+    Raises:
+        TimeoutError: if the deadline expires.
+    '''
+    if deadline is None:
+        yield
+        return
+
+    with _deadline_scope(time.monotonic() + deadline, deadline):
+        yield
+
+
+@contextmanager
+def _deadline_scope(expires: float, deadline: float):
+    '''
+    Run a block under a deadline expiring at `expires` (a `time.monotonic()` timestamp).
+    '''
+    previous = get_deadline()
+    _local.deadline = expires if previous is None else min(previous, expires)
+
+    try:
+        yield
+
+    # requests' own timeouts are capped to the deadline, so they may be the first to expire
+    except (requests.Timeout, TimeoutError) as e:
+        if time.monotonic() >= _local.deadline:
+            raise TimeoutError(f'Deadline of {deadline}s expired.') from e
+        raise
+
+    finally:
+        _local.deadline = previous
+
+
+def parallelize(function: callable, data: list[any], threads: int = 50, await_completion: bool = True,
+        deadline: float = None) -> list[any]:
     '''
     Parallelize the execution of a method over a list of arguments.
 
@@ -50,22 +144,239 @@ def parallelize(function: callable, data: list[any], threads: int = 50, await_co
         threads (int, optional): number of threads to use. Defaults to 50.
         await_completion (bool, optional): if `True` waits for and returns a list of results; 
             If `False` it immeditely returns a list of futures that need to be waited for. Defaults to True.
+        deadline (float, optional): max number of seconds to wait for all results. When it expires, the
+            pending calls are cancelled, and requests still waiting for the rate limit are dropped.
+            Only used if `await_completion` is `True`. Defaults to None.
+
+    Raises:
+        TimeoutError: if the deadline expires before all results are available.
 
     Returns:
         list[any]: list of futures or results.
     '''
     executor = ThreadPoolExecutor(max_workers = threads)
-    futures = executor.map(function, data)
-    results = list(futures) if await_completion else futures
-    return results
 
+    if deadline is None or not await_completion:
+        futures = executor.map(function, data)
+        results = list(futures) if await_completion else futures
+        return results
+
+    expires = time.monotonic() + deadline
+
+    def run(argument):
+        with _deadline_scope(expires, deadline):
+            return function(argument)
+
+    futures = [executor.submit(run, argument) for argument in data]
+    _, pending = wait(futures, timeout = deadline)
+    executor.shutdown(wait = False, cancel_futures = True)
+
+    if pending:
+        raise TimeoutError(f'Deadline of {deadline}s expired with {len(pending)} of {len(futures)} calls pending.')
+
+    return [future.result() for future in futures]
+
+
+def parallelize_multiargs(function: callable, data: list[any], threads: int = 50, await_completion: bool = True,
+        deadline: float = None) -> list[any]:
+    return parallelize(lambda args: function(*args), data, threads, await_completion, deadline)
+
+
+def chunk(data: list[any], size: int) -> list[list[any]]:
+    '''
+    Split a list into consecutive chunks.
+
+    Args:
+        data (list[any]): list to split.
+        size (int): max length of each chunk.
+
+    Returns:
+        list[list[any]]: list of chunks (the last one may be shorter).
+    '''
+    data = list(data)
+    return [data[i:i+size] for i in range(0, len(data), size)]
+
+
+def batch_request(send: callable, ids: list[str], result_keys: list[str], chunk_size: int = 100, 
+        threads: int = 50, deadline: float = None, error_key: str = 'errors', 
+        on_result: callable = None, max_failed_splits: int = 3) -> dict[str, list[any]]:
+    '''
+    Run a bulk API operation over a list of IDs, in concurrent chunks.
+    The IDs are split into chunks of up to `chunk_size`, and `send` is called on each of them in parallel.
+    If a chunk is rejected by the API as invalid (a 400, 409 or 422 error), it is split in half and both
+    halves are retried, until the IDs that cause the error are isolated; those are reported under `error_key`,
+    while all other IDs are processed normally. The lists in the responses are merged into one.
+
+    A rejection that has nothing to do with the IDs (e.g. the collection is not published) fails every half
+    of every split. So if both halves of `max_failed_splits` splits of a chunk are rejected before any part
+    of it is accepted, the chunk's original error is raised instead, and the other chunks are not sent.
+
+    Args:
+        send (callable): function that sends one chunk (a list of IDs) and returns the parsed response.
+        ids (list[str]): IDs to process.
+        result_keys (list[str]): keys of the lists to merge from each response (e.g. `publishedItemIds`).
+        chunk_size (int, optional): max number of IDs per request. Defaults to 100.
+        threads (int, optional): number of threads to use. Defaults to 50.
+        deadline (float, optional): max number of seconds for the whole operation (see `parallelize`).
+            Defaults to None.
+        error_key (str, optional): key of the list of failures, as `{'id': id, 'error': body}` dictionaries 
+            (the body of the API's error response, or the API's own error entry). Defaults to 'errors'.
+        on_result (callable, optional): function called with each response (or `{error_key: [error]}` for 
+            each isolated ID) as soon as it is available, e.g. to report progress. Defaults to None.
+        max_failed_splits (int, optional): number of splits of a chunk with both halves rejected, before
+            any part of it is accepted, after which the rejection is not narrowed down further. Defaults to 3.
+
+    Raises:
+        requests.HTTPError: on any other error (e.g. 401, 403, 404, 429 or 5xx), or on a rejection that does
+            not come from specific IDs, which would fail for all IDs.
+
+    Returns:
+        dict[str, list[any]]: one merged list per key of `result_keys` (and `error_key`).
+    '''
+    aborted = []
+
+    def post(ids: list[str]) -> tuple[dict[str, list[any]], requests.HTTPError]:
+        '''
+        Send one request, returning the response, or the error if the payload was rejected.
+        '''
+        if aborted:
+            raise aborted[0]
+
+        try:
+            resp = send(ids)
+
+        except requests.HTTPError as e:
+            # only a bad payload can be narrowed down (not auth, permissions, missing endpoints, or limits)
+            if e.response is None or e.response.status_code not in _BISECT_STATUSES:
+                aborted.append(e)
+                raise
+
+            return None, e
+
+        resp = {**resp, error_key: [_error_entry(error) for error in resp.get(error_key, [])]}
+
+        if on_result is not None:
+            on_result(resp)
+
+        return resp, None
+
+    def isolate(ids: list[str], error: requests.HTTPError, state: dict[str, any]) -> list[dict[str, list[any]]]:
+        if len(ids) == 1:
+            resp = {error_key: [{'id': ids[0], 'error': _error_body(error.response)}]}
+
+            if on_result is not None:
+                on_result(resp)
+
+            return [resp]
+
+        middle = len(ids) // 2
+        halves = [(half, *post(half)) for half in (ids[:middle], ids[middle:])]
+
+        if all(error is not None for _, _, error in halves) and not state['accepted']:
+            state['failed_splits'] += 1
+
+            if state['failed_splits'] >= max_failed_splits:
+                aborted.append(state['error'])
+                raise state['error']
+
+        state['accepted'] |= any(error is None for _, _, error in halves)
+        resps = []
+
+        for half, resp, error in halves:
+            resps += [resp] if error is None else isolate(half, error, state)
+
+        return resps
+
+    def run(ids: list[str]) -> list[dict[str, list[any]]]:
+        resp, error = post(ids)
+
+        if error is None:
+            return [resp]
+
+        return isolate(ids, error, {'error': error, 'accepted': False, 'failed_splits': 0})
+
+    data = {key: [] for key in [*result_keys, error_key]}
+    returns = parallelize(run, chunk(ids, chunk_size), threads, deadline = deadline)
+
+    # merge responses
+    for key in data:
+        data[key] = [item for resps in returns for resp in resps for item in resp.get(key, [])]
+
+    return data
+
+
+def _error_body(response: requests.Response) -> any:
+    '''
+    Parsed body of an error response (its text if it is not JSON).
+    '''
+    try:
+        return response.json()
+    except ValueError:
+        return response.text
+
+
+def _error_entry(error: any) -> dict[str, any]:
+    '''
+    Error reported by the API in a successful bulk response, as an `{'id': id, 'error': body}` dictionary.
+    '''
+    if isinstance(error, dict):
+        return {'id': error.get('id', error.get('itemId')), 'error': error}
+
+    return {'id': error, 'error': None}
+
+
+class LatencyTracker:
+    """
+    A LatencyTracker keeps the most recent latencies of some operation, to estimate its percentiles.
+
+    Attributes:
+        window (int): number of recent samples to keep.
+        min_samples (int): number of samples needed before estimating percentiles.
+    """
+
+    def __init__(self, window: int = 500, min_samples: int = 20):
+        '''
+        Create a new LatencyTracker object.
+
+        Args:
+            window (int, optional): number of recent samples to keep. Defaults to 500.
+            min_samples (int, optional): number of samples needed before estimating percentiles. Defaults to 20.
+        '''
+        self.window = window
+        self.min_samples = min_samples
+        self._samples = deque(maxlen = window)
+
+
+    def record(self, seconds: float) -> None:
+        '''
+        Add a sample.
+
+        Args:
+            seconds (float): latency of one operation.
+        '''
+        self._samples.append(seconds)
+
+
+    def percentile(self, p: float) -> float:
+        '''
+        Estimate a percentile of the recent latencies.
+
+        Args:
+            p (float): percentile, between 0 and 100.
+
+        Returns:
+            float: the estimated latency in seconds, or `None` if there are not enough samples yet.
+        '''
+        samples = sorted(self._samples)
+
+        if len(samples) < self.min_samples:
+            return None
 
-def parallelize_multiargs(function: callable, data: list[any], threads: int = 50, await_completion: bool = True) -> list[any]:
-    return parallelize(lambda args: function(*args), data, threads, await_completion)
+        return samples[min(len(samples) - 1, int(len(samples) * p / 100))]
 
 
 def try_request(request_fn: callable, url: str, headers: dict[str, str], data: dict = None, 
-        max_retries: int = 50, delay: float = 10) -> dict:
+        max_retries: int = 50, delay: float = 10, timeout: tuple[float, float] = (5, 30)) -> dict:
     '''
     Execute a request to the WebFlow API with implicit Rate Limit handling.
 
@@ -76,6 +387,7 @@ def try_request(request_fn: callable, url: str, headers: dict[str, str], data: d
         data (dict, optional): optional data to supply as a JSON object. Defaults to None.
         max_retries (int, optional): number of times a limit hit error is retried. Defaults to 50.
         delay (float, optional): seconds to wait before retrying after hitting a rate limit. Defaults to 10.
+        timeout (tuple[float, float], optional): connect and read timeouts in seconds. Defaults to (5, 30).
 
     Returns:
         dict: parsed dictionary of the response's JSON.
@@ -83,7 +395,7 @@ def try_request(request_fn: callable, url: str, headers: dict[str, str], data: d
     retry = 0
 
     while True:
-        response = request_fn(url, json = data, headers = headers)
+        response = request_fn(url, json = data, headers = headers, timeout = timeout)
 
         # hit API limit
         if response.status_code == 429 and retry < max_retries: 
@@ -0,0 +1,111 @@
+import hashlib
+import json
+import threading
+import pytest
+from email.parser import BytesParser
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from webflow import config, scheduler
+from webflow.entity import Entity
+from webflow.cms import Site, AssetCache, hash_file
+
+
+class StandInUpload(BaseHTTPRequestHandler):
+    '''
+    Stands in for both WebFlow's create asset endpoint (`/assets`) and the presigned upload target (`/upload`).
+    '''
+    assets, uploads = [], {}
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers['Content-Length']))
+
+        if self.path == '/assets':
+            asset = json.loads(body)
+            self.assets.append(asset)
+            answer = {'uploadUrl': f'http://127.0.0.1:{self.server.server_port}/upload', 
+                'uploadDetails': {'key': asset['fileName'], 'policy': 'signed'}}
+
+            if not asset['fileName'].startswith('no-url'):
+                answer['hostedUrl'] = f'https://cdn.example.com/{asset["fileHash"]}/{asset["fileName"]}'
+
+            self.answer(200, json.dumps(answer).encode())
+        else:
+            message = BytesParser().parsebytes(f'Content-Type: {self.headers["Content-Type"]}\r\n\r\n'.encode() + body)
+            parts = {part.get_param('name', header = 'content-disposition'): part.get_payload(decode = True) 
+                for part in message.get_payload()}
+            assert parts['policy'] == b'signed', 'Upload fields were not sent.'
+            self.uploads[parts['key'].decode()] = hashlib.md5(parts['file']).hexdigest()
+            self.answer(204, b'')
+
+    def answer(self, status, body):
+        self.send_response(status)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope = 'module')
+def site():
+    # the token and the shared scheduler are restored for the other test modules
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(config, '_auth_token', config._auth_token or 'test-token')
+        patch.setattr(scheduler, '_scheduler', scheduler.RequestScheduler(None))
+
+        server = ThreadingHTTPServer(('127.0.0.1', 0), StandInUpload)
+        threading.Thread(target = server.serve_forever, daemon = True).start()
+
+        site = Site.__new__(Site)
+        Entity.__init__(site, 'site1')
+        site._assets_url = f'http://127.0.0.1:{server.server_port}/assets'
+        yield site
+        server.shutdown()
+
+
+def test_hash_file(tmp_path):
+    path = tmp_path / 'big.bin'
+    path.write_bytes(b'x' * (3 << 20))
+    assert hash_file(str(path), chunk_size = 1000) == hashlib.md5(b'x' * (3 << 20)).hexdigest(), 'Wrong hash.'
+
+
+def test_cache_saves_once(tmp_path):
+    path = tmp_path / 'assets.json'
+    cache = AssetCache(str(path))
+    cache.put('site1', 'hash1', 'https://cdn.example.com/1')
+
+    assert not path.exists(), 'Cache was written on every entry.'
+    cache.save()
+    assert AssetCache(str(path)).get('site1', 'hash1') == 'https://cdn.example.com/1', 'Cache was not saved.'
+
+
+def test_upload_assets(site, tmp_path):
+    paths = []
+
+    for name, content in [('a.png', b'first'), ('b.png', b'second'), ('copy-of-a.png', b'first')]:
+        (tmp_path / name).write_bytes(content)
+        paths.append(str(tmp_path / name))
+
+    cache = AssetCache(str(tmp_path / 'cache' / 'assets.json'))
+    urls = site.upload_assets(paths, cache)
+
+    assert len(StandInUpload.assets) == 2, 'Files with the same content were uploaded twice.'
+    assert urls[0] == urls[2] and urls[0] != urls[1], 'Returned URLs do not match the files.'
+    assert StandInUpload.uploads == {'a.png': hashlib.md5(b'first').hexdigest(), 
+        'b.png': hashlib.md5(b'second').hexdigest()}, 'Uploaded content is wrong.'
+
+    # a new run with the same cache file uploads nothing
+    reloaded = AssetCache(str(tmp_path / 'cache' / 'assets.json'))
+    assert site.upload_assets(paths, reloaded) == urls, 'Cached URLs are wrong.'
+    assert len(StandInUpload.assets) == 2, 'Cached files were uploaded again.'
+
+
+def test_upload_without_url(site, tmp_path):
+    (tmp_path / 'no-url.png').write_bytes(b'third')
+    cache = AssetCache(str(tmp_path / 'assets.json'))
+
+    with pytest.raises(ValueError):
+        site.upload_assets([str(tmp_path / 'no-url.png')], cache)
+
+    assert cache.get('site1', hashlib.md5(b'third').hexdigest()) is None, 'A missing URL was cached.'
@@ -0,0 +1,120 @@
+import time
+import pytest
+import requests
+
+from webflow.cms import ItemCache, PatchBuffer
+
+
+class StandInCollection:
+    '''
+    Records the requests a PatchBuffer sends instead of calling the API.
+    '''
+    def __init__(self, failing: dict = None):
+        self.patches, self.published, self.failing = [], [], failing or {}
+
+    def patch_item(self, item_id, fields, draft = False, priority = None):
+        if self.failing.get(item_id):
+            response = requests.Response()
+            response.status_code = self.failing[item_id].pop(0)
+            raise requests.HTTPError(f'{response.status_code} Error', response = response)
+        self.patches.append((item_id, fields))
+        return {'_id': item_id, **fields}
+
+    def publish_items(self, item_ids):
+        self.published.append(list(item_ids))
+        return {'publishedItemIds': list(item_ids), 'errors': []}
+
+
+def test_merge_patches():
+    collection = StandInCollection()
+    cache = ItemCache('col1')
+
+    with PatchBuffer(collection, max_delay = None, cache = cache) as buffer:
+        buffer.patch('a', {'name': 'A'})
+        buffer.patch('a', {'slug': 'a'})
+        buffer.patch('a', {'name': 'A2'})
+        buffer.patch('b', {'name': 'B'})
+        assert len(buffer) == 2, 'Patches to the same item were not merged.'
+        assert collection.patches == [], 'Patches were sent before flushing.'
+
+    assert sorted(collection.patches) == [('a', {'name': 'A2', 'slug': 'a'}), ('b', {'name': 'B'})], \
+        'Merged patches are wrong.'
+    assert [sorted(ids) for ids in collection.published] == [['a', 'b']], 'Items were not published once.'
+    assert cache['a']['name'] == 'A2', 'Cache was not updated.'
+
+
+def test_size_trigger():
+    collection = StandInCollection()
+    buffer = PatchBuffer(collection, max_items = 3, max_delay = None, publish = False)
+
+    for i in range(7):
+        buffer.patch(str(i), {'name': str(i)})
+
+    assert len(collection.patches) == 6 and len(buffer) == 1, 'Size trigger did not flush.'
+    assert collection.published == [], 'Items were published with `publish = False`.'
+
+
+def test_drafts_not_published():
+    collection = StandInCollection()
+
+    with PatchBuffer(collection, max_delay = None, draft = True) as buffer:
+        buffer.patch('a', {'name': 'A'})
+
+    assert collection.patches and collection.published == [], 'Draft changes were published.'
+
+
+def test_time_trigger():
+    collection = StandInCollection()
+    buffer = PatchBuffer(collection, max_delay = 0.1)
+    buffer.patch('a', {'name': 'A'})
+    time.sleep(0.5)
+
+    assert collection.patches == [('a', {'name': 'A'})], 'Time trigger did not flush.'
+
+
+def test_failed_patch():
+    collection = StandInCollection(failing = {'b': [400]})
+    buffer = PatchBuffer(collection, max_delay = None)
+    buffer.patch('a', {'name': 'A'})
+    buffer.patch('b', {'name': 'B'})
+    data = buffer.flush()
+
+    assert data['patchedItemIds'] == data['publishedItemIds'] == ['a'], 'A failed patch stopped the others.'
+    assert [error['id'] for error in data['errors']] == ['b'], 'A failed patch was not isolated.'
+    assert data['errors'][0]['error'].response.status_code == 400, 'The error of a failed patch was lost.'
+    assert len(buffer) == 0, 'An invalid patch was put back in the buffer.'
+
+
+def test_retry_transient():
+    collection = StandInCollection(failing = {'a': [503, 503, 503]})
+    buffer = PatchBuffer(collection, max_delay = None, max_attempts = 3)
+    buffer.patch('a', {'name': 'A', 'slug': 'a'})
+
+    assert buffer.flush()['retriedItemIds'] == ['a'], 'A transient failure was not retried.'
+    buffer.patch('a', {'name': 'A2'})
+    assert buffer.flush()['retriedItemIds'] == ['a'], 'A transient failure was not retried.'
+    assert buffer._pending == {'a': {'name': 'A2', 'slug': 'a'}}, 'Newer patch was overwritten by the retried one.'
+
+    data = buffer.flush()
+    assert data['errors'][0]['id'] == 'a' and len(buffer) == 0, 'Retries did not stop after `max_attempts`.'
+
+
+def test_timed_flush_results():
+    collection = StandInCollection()
+    results = []
+    buffer = PatchBuffer(collection, max_delay = 0.1, on_flush = results.append)
+    buffer.patch('a', {'name': 'A'})
+    time.sleep(0.5)
+
+    assert results and results[0]['patchedItemIds'] == ['a'], 'Time-triggered flush results were lost.'
+
+
+def test_timed_flush_error():
+    collection = StandInCollection()
+    collection.publish_items = lambda ids: 1 / 0
+    buffer = PatchBuffer(collection, max_delay = 0.1)
+    buffer.patch('a', {'name': 'A'})
+    time.sleep(0.5)
+
+    with pytest.raises(ZeroDivisionError):
+        buffer.patch('b', {'name': 'B'})
@@ -33,3 +33,27 @@ def test_get_items():
 def test_delete_items():
     pass
 
+
+def test_publish_items_chunks():
+    collection = Collection.__new__(Collection)
+    collection._url, collection._max_items_per_request = 'https://api.webflow.com/collections/col1', 100
+    calls, progress = [], []
+    collection._put = lambda url, payload, priority: calls.append(payload) or {'publishedItemIds': payload['itemIds']}
+
+    data = collection.publish_items([str(i) for i in range(250)], chunk_size = 500, progress = progress.append)
+
+    assert max(len(call['itemIds']) for call in calls) == 100, 'Chunks were not capped at the API limit.'
+    assert len(data['publishedItemIds']) == 250 and len(progress) == 3, 'Progress was not reported per chunk.'
+
+
+def test_post_items_check_slugs():
+    collection = Collection.__new__(Collection)
+    collection.id, collection.data = 'col-slugs', {'fields': [
+        {'slug': 'name', 'type': 'PlainText', 'required': True, 'editable': True},
+        {'slug': 'slug', 'type': 'PlainText', 'required': True, 'editable': True},
+    ]}
+    collection.get_all_items = lambda deadline = None: [{'_id': '1', 'name': 'Mug', 'slug': 'mug'}]
+    collection.post_item = lambda fields, **kwargs: fields
+
+    items = collection.post_items([{'name': 'Mug'}], check_slugs = True)
+    assert items[0]['slug'] == 'mug-2', 'Generated slug collides with an existing item.'
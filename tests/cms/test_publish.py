@@ -0,0 +1,96 @@
+import threading
+import time
+import pytest
+
+from webflow.cms import PublishCoordinator
+
+
+class StandInSite:
+    '''
+    Records the requests a PublishCoordinator sends instead of calling the API.
+    '''
+    _url = 'https://api.webflow.com/sites/site1'
+
+    def __init__(self, latency = 0):
+        self.posts, self.domain_fetches, self.latency = [], 0, latency
+        self.running = self.max_running = 0
+
+    def get_domains(self, priority = None):
+        self.domain_fetches += 1
+        return [{'_id': '1', 'name': 'site1.webflow.io'}, {'_id': '2', 'name': 'www.site1.com'}]
+
+    def _post(self, url, payload, priority = None):
+        self.posts.append((url, payload))
+        self.running += 1
+        self.max_running = max(self.running, self.max_running)
+        time.sleep(self.latency)
+        self.running -= 1
+        return {'queued': True}
+
+
+def test_first_publish_is_immediate():
+    site = StandInSite()
+    start = time.monotonic()
+    PublishCoordinator('site1').publish(site, ['a.com'], debounce = 2).result()
+
+    assert time.monotonic() - start < 0.5, 'A lone publish waited for the debounce window.'
+
+
+def test_merge_publishes():
+    site = StandInSite()
+    coordinator = PublishCoordinator('site1')
+    coordinator.publish(site, ['first.com'], debounce = 0.2).result()
+
+    futures = []
+    threads = [threading.Thread(target = lambda d = d: futures.append(coordinator.publish(site, d, 0.2))) 
+        for d in (['a.com'], ['b.com', 'a.com'], ['c.com'])]
+
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    results = [future.result() for future in futures]
+    assert results == [{'queued': True}] * 3, 'Callers did not get the publish response.'
+    assert len(site.posts) == 2, 'Publish requests were not merged.'
+    assert sorted(site.posts[1][1]['domains']) == ['a.com', 'b.com', 'c.com'], 'Domains were not merged.'
+    assert site.domain_fetches == 0, 'Domains were fetched without publishing to all of them.'
+
+
+def test_latest_site_and_debounce():
+    old_site, new_site = StandInSite(), StandInSite()
+    coordinator = PublishCoordinator('site1')
+    coordinator.publish(old_site, ['a.com'], debounce = 10).result()
+
+    time.sleep(0.1)
+    start = time.monotonic()
+    coordinator.publish(new_site, ['a.com'], debounce = 0).result()
+
+    assert time.monotonic() - start < 0.5, 'The debounce of the calling site was ignored.'
+    assert len(new_site.posts) == 1, 'Publish was not sent through the calling site.'
+
+
+def test_cached_domains():
+    site = StandInSite()
+    coordinator = PublishCoordinator('site1')
+
+    coordinator.publish(site, ['a.com'], 0).result()
+    coordinator.publish(site, None, 0).result()
+    coordinator.publish(site, None, 0).result()
+
+    assert len(site.posts) == 3, 'Separate publish requests were merged.'
+    assert site.posts[1][1]['domains'] == ['site1.webflow.io', 'www.site1.com'], 'Not published to all domains.'
+    assert site.domain_fetches == 1, 'Domains were not cached.'
+
+
+def test_one_publish_at_a_time():
+    site = StandInSite(latency = 0.5)
+    coordinator = PublishCoordinator('site1')
+    first = coordinator.publish(site, ['a.com'], debounce = 0.1)
+
+    time.sleep(0.2)
+    second = coordinator.publish(site, ['b.com'], debounce = 0.1)
+    first.result(), second.result()
+
+    assert site.max_running == 1, 'A publish was sent while another one was in flight.'
+    assert len(site.posts) == 2, 'The publish made while another one was in flight was lost.'
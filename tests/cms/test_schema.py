@@ -0,0 +1,99 @@
+import pytest
+
+from webflow.cms import Validator, ValidationError, get_validator, invalidate_validator
+from webflow.utils import slugify_all
+
+
+schema = [
+    {'slug': 'name', 'type': 'PlainText', 'required': True, 'editable': True, 'validations': {'maxLength': 10}},
+    {'slug': 'slug', 'type': 'PlainText', 'required': True, 'editable': True, 'validations': {'maxLength': 256}},
+    {'slug': 'price', 'type': 'Number', 'required': False, 'editable': True, 
+        'validations': {'format': 'integer', 'allowNegative': False}},
+    {'slug': 'size', 'type': 'Option', 'required': False, 'editable': True, 
+        'validations': {'options': [{'name': 'Small', 'id': 'id-s'}, {'name': 'Large', 'id': 'id-l'}]}},
+    {'slug': 'contact', 'type': 'Email', 'required': False, 'editable': True},
+    {'slug': 'created-on', 'type': 'Date', 'required': False, 'editable': False},
+]
+
+
+def test_slugify_all():
+    slugs = slugify_all(['Caffè Latte', 'caffe latte', 'Caffe Latte', 'Tea'], taken = {'tea'})
+    assert slugs == ['caffe-latte', 'caffe-latte-2', 'caffe-latte-3', 'tea-2'], 'Slug collisions were not handled.'
+
+
+def test_normalize():
+    items = Validator(schema).validate_all([
+        {'name': 'Mug', 'price': '12', 'size': 'Large'},
+        {'name': 'Mug', 'slug': 'mug-xl', 'size': 'id-s', '_draft': True},
+        {'name': 'Mug'},
+    ], taken_slugs = {'mug'})
+
+    assert items[0] == {'name': 'Mug', 'slug': 'mug-2', 'price': 12, 'size': 'id-l'}, 'Item was not normalized.'
+    assert items[1] == {'name': 'Mug', 'slug': 'mug-xl', 'size': 'id-s', '_draft': True}, 'Valid item was changed.'
+    assert items[2]['slug'] == 'mug-3', 'Generated slug collides.'
+
+
+def test_errors():
+    with pytest.raises(ValidationError) as error:
+        Validator(schema).validate_all([
+            {'name': 'A very long name'},
+            {'name': 'Ok', 'slug': 'Not A Slug', 'price': -1},
+            {'slug': 'no-name', 'size': 'Medium', 'color': 'red'},
+            {'name': 'Ok', 'contact': 'nobody'},
+        ])
+
+    errors = error.value.errors
+    assert set(errors[0]) == {'name'}, 'Over-long text was not detected.'
+    assert set(errors[1]) == {'slug', 'price'}, 'Invalid slug or negative number were not detected.'
+    assert set(errors[2]) == {'name', 'size', 'color'}, 'Missing, unknown or invalid option fields were not detected.'
+    assert set(errors[3]) == {'contact'}, 'Invalid email was not detected.'
+
+
+def test_system_fields():
+    system = schema + [
+        {'slug': '_archived', 'type': 'Bool', 'required': True, 'editable': True},
+        {'slug': '_draft', 'type': 'Bool', 'required': True, 'editable': True},
+    ]
+    validator = Validator(system)
+    fields = validator.validate({'name': 'Mug', 'created-on': '2024-01-01T00:00:00Z', '_id': 'x'})
+
+    assert fields == {'name': 'Mug', 'slug': 'mug', '_id': 'x'}, 'System or read-only fields were not handled.'
+    assert not validator.required & {'_archived', '_draft'}, 'System fields are required from the user.'
+
+
+def test_generated_slugs():
+    items = Validator(schema).validate_all([{'name': 'Straße 東京'}, {'name': 'Straße (2)'}])
+    assert [item['slug'] for item in items] == ['strasse', 'strasse-2'], 'Generated slugs are not valid.'
+
+    short = [{**field, 'validations': {'maxLength': 8}} if field['slug'] == 'slug' else field for field in schema]
+    items = Validator(short).validate_all([{'name': 'Long mug s'}, {'name': 'Long mug s'}])
+    assert [item['slug'] for item in items] == ['long-mug', 'long-m-2'], 'Generated slugs are too long.'
+
+    with pytest.raises(ValidationError) as error:
+        Validator(schema).validate({'name': '東京'})
+
+    assert set(error.value.errors[0]) == {'slug'}, 'Invalid generated slug was not reported.'
+
+
+def test_partial():
+    fields = Validator(schema).validate({'price': 3.0}, partial = True)
+    assert fields == {'price': 3}, 'Partial update was not allowed.'
+
+
+def test_no_slug_generation():
+    with pytest.raises(ValidationError) as error:
+        Validator(schema).validate({'name': 'Mug'}, generate_slugs = False)
+
+    assert set(error.value.errors[0]) == {'slug'}, 'A slug was made up for an existing item.'
+
+
+def test_validator_cache():
+    validator = get_validator('col1', schema)
+    assert get_validator('col1', list(schema)) is validator, 'Same schema was compiled again.'
+    assert get_validator('col1') is validator, 'Cached validator was not used.'
+
+    changed = schema + [{'slug': 'color', 'type': 'Color', 'required': False, 'editable': True}]
+    assert 'color' in get_validator('col1', changed).fields, 'Changed schema was not compiled again.'
+
+    invalidate_validator('col1')
+    assert get_validator('col1', schema) is not validator, 'Validator was not invalidated.'
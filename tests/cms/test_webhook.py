@@ -0,0 +1,80 @@
+import hmac
+import hashlib
+import json
+import time
+import pytest
+import requests
+
+from webflow.cms import ItemCache, WebhookReceiver
+
+
+secret = 'test-secret'
+
+
+def post_event(path: str, payload: dict, key: str = secret) -> requests.Response:
+    body = json.dumps(payload).encode()
+    timestamp = str(int(time.time() * 1000))
+    signature = hmac.new(key.encode(), timestamp.encode() + b':' + body, hashlib.sha256).hexdigest()
+    headers = {'x-webflow-timestamp': timestamp, 'x-webflow-signature': signature}
+
+    return requests.post(pytest.webhook_url + path, data = body, headers = headers)
+
+
+def test_start_receiver():
+    cache = ItemCache('col1', [{'_id': 'a', '_cid': 'col1', 'name': 'A'}])
+    receiver = WebhookReceiver(secret, [cache])
+    published = []
+    receiver.on('site_publish', published.append)
+    server = receiver.serve('127.0.0.1', 0, blocking = False)
+
+    pytest.webhook_url = f'http://127.0.0.1:{server.server_port}'
+    pytest.cache, pytest.published, pytest.server = cache, published, server
+
+
+def test_item_created():
+    response = post_event('/collection_item_created', {'_id': 'b', '_cid': 'col1', 'name': 'B'})
+    assert response.status_code == 200, 'Created event was rejected.'
+    assert pytest.cache['b']['name'] == 'B', 'Created item was not added to the cache.'
+
+
+def test_item_changed():
+    response = post_event('/collection_item_changed', {'_id': 'a', '_cid': 'col1', 'slug': 'a-slug'})
+    assert response.status_code == 200, 'Changed event was rejected.'
+    assert pytest.cache['a'] == {'_id': 'a', '_cid': 'col1', 'name': 'A', 'slug': 'a-slug'}, \
+        'Changed item was not merged into the cache.'
+
+
+def test_item_deleted():
+    response = post_event('/', {'triggerType': 'collection_item_deleted', 'payload': {'id': 'b'}})
+    assert response.status_code == 200, 'Deleted event was rejected.'
+    assert 'b' not in pytest.cache, 'Deleted item is still in the cache.'
+
+
+def test_site_publish():
+    response = post_event('/site_publish', {'site': 'site1'})
+    assert response.status_code == 200, 'Publish event was rejected.'
+    assert pytest.published == [{'site': 'site1'}], 'Publish callback was not called.'
+
+
+def test_missing_item_id():
+    response = post_event('/collection_item_changed', {'_cid': 'col1', 'name': 'A'})
+    assert response.status_code == 400, 'Event without an item ID was not rejected.'
+
+    response = post_event('/collection_item_deleted', {'deleted': 1})
+    assert response.status_code == 400, 'Event without an item ID was not rejected.'
+
+
+def test_secret_required():
+    with pytest.raises(ValueError):
+        WebhookReceiver()
+
+    receiver = WebhookReceiver(verify = False)
+    assert receiver.handle('/site_publish', b'{}', {}) == 200, 'Unsigned request was rejected with `verify = False`.'
+
+
+def test_bad_signature():
+    response = post_event('/collection_item_created', {'_id': 'c', '_cid': 'col1'}, key = 'wrong')
+    assert response.status_code == 401, 'Request with a bad signature was accepted.'
+    assert 'c' not in pytest.cache, 'Unsigned event was applied to the cache.'
+
+    pytest.server.shutdown()
@@ -0,0 +1,88 @@
+import pytest
+import requests
+
+from webflow.utils import batch_request, chunk
+
+
+def rejecting(bad_ids: set, status: int = 400, everything: bool = False) -> callable:
+    '''
+    Stand-in for a bulk endpoint that rejects whole requests containing any of `bad_ids` (or all of them).
+    '''
+    calls = []
+
+    def send(ids):
+        calls.append(list(ids))
+
+        if everything or bad_ids & set(ids):
+            response = requests.Response()
+            response.status_code = status
+            response._content = b'{"msg": "Validation Failure"}'
+            raise requests.HTTPError(f'{status} Client Error', response = response)
+
+        return {'publishedItemIds': list(ids), 'errors': []}
+
+    send.calls = calls
+    return send
+
+
+def test_chunk():
+    assert chunk(range(5), 2) == [[0, 1], [2, 3], [4]], 'List was not split correctly.'
+
+
+def test_merge():
+    ids = [str(i) for i in range(350)]
+    send = rejecting(set())
+    data = batch_request(send, ids, ['publishedItemIds'])
+
+    assert len(send.calls) == 4, 'IDs were not sent in chunks of 100.'
+    assert sorted(data['publishedItemIds']) == sorted(ids) and data['errors'] == [], 'Responses were not merged.'
+
+
+def test_bisect():
+    ids = [str(i) for i in range(250)]
+    send = rejecting({'42', '230'})
+    data = batch_request(send, ids, ['publishedItemIds'])
+
+    assert sorted(error['id'] for error in data['errors']) == ['230', '42'], 'Bad IDs were not isolated.'
+    assert data['errors'][0]['error'] == {'msg': 'Validation Failure'}, 'The API error was lost.'
+    assert len(data['publishedItemIds']) == 248, 'Good IDs in failed chunks were not retried.'
+    assert len(send.calls) < 40, 'Bisecting sent too many requests.'
+
+
+def test_server_error():
+    with pytest.raises(requests.HTTPError):
+        batch_request(rejecting({'1'}, status = 500), ['0', '1'], ['publishedItemIds'])
+
+
+@pytest.mark.parametrize('status', [401, 403, 429])
+def test_request_error(status):
+    send = rejecting({'1'}, status = status)
+
+    with pytest.raises(requests.HTTPError):
+        batch_request(send, [str(i) for i in range(300)], ['publishedItemIds'])
+
+    assert len(send.calls) <= 3, f'Chunks were bisected on a {status} error.'
+
+
+def test_bisect_neighbours():
+    send = rejecting({'0', '1', '50', '51'})
+    data = batch_request(send, [str(i) for i in range(100)], ['publishedItemIds'])
+
+    assert sorted(error['id'] for error in data['errors']) == ['0', '1', '50', '51'], 'Bad IDs were not isolated.'
+
+
+def test_whole_rejection():
+    send = rejecting(set(), everything = True)
+
+    with pytest.raises(requests.HTTPError) as error:
+        batch_request(send, [str(i) for i in range(300)], ['publishedItemIds'], threads = 1)
+
+    assert error.value.response.json() == {'msg': 'Validation Failure'}, 'The API error was lost.'
+    assert len(send.calls) <= 7, 'A rejection of the whole request was bisected.'
+
+
+def test_api_errors():
+    send = lambda ids: {'publishedItemIds': ids[1:], 'errors': [ids[0]]}
+    data = batch_request(send, ['a', 'b'], ['publishedItemIds'])
+
+    assert data['errors'] == [{'id': 'a', 'error': None}], 'Errors reported by the API were not normalized.'
@@ -0,0 +1,151 @@
+import json
+import threading
+import pytest
+import requests
+from urllib.parse import urlsplit, parse_qsl
+
+from webflow import config, scheduler
+from webflow.cms import Validator
+from webflow.cli import make_parser, main, read_items, write_items, _strip_system_fields
+
+
+validator = Validator([
+    {'slug': 'name', 'type': 'PlainText', 'editable': True},
+    {'slug': 'year', 'type': 'PlainText', 'editable': True},
+    {'slug': 'price', 'type': 'Number', 'editable': True},
+    {'slug': 'on-sale', 'type': 'Bool', 'editable': True},
+    {'slug': 'tags', 'type': 'ItemRefSet', 'editable': True},
+    {'slug': 'created-on', 'type': 'Date', 'editable': False},
+])
+
+items = [
+    {'_id': '5f2b0c1d9e8a7b6c5d4e3f21', 'name': 'Mug', 'year': '2024', 'price': 12, 'tags': ['a', 'b']},
+    {'_id': '123456789012345678901234', 'name': 'true', 'year': '12', 'price': 3.5, 'on-sale': True},
+]
+
+
+@pytest.mark.parametrize('format', ['json', 'jsonl', 'csv'])
+def test_round_trip(tmp_path, format):
+    path = str(tmp_path / f'items.{format}')
+    write_items(items, path)
+    assert read_items(path, validator = validator) == items, f'Items changed through a {format} file.'
+
+
+def test_csv_text(tmp_path):
+    path = str(tmp_path / 'items.csv')
+    write_items(items, path)
+    assert read_items(path)[0]['price'] == '12', 'CSV cells were not read as text without a schema.'
+
+
+def test_strip_system_fields():
+    item = {'_id': '1', '_cid': '2', '_draft': False, 'name': 'Mug', 'created-on': '2024-01-01'}
+    assert _strip_system_fields(item, validator) == {'name': 'Mug'}, 'System fields were not removed.'
+
+
+def test_parser():
+    args = make_parser().parse_args(['delete', 'col1', '--all', '--concurrency', '8', '--rate-limit', '0',
+        '--token', 'x', '--summary', '-'])
+
+    assert (args.collection_id, args.all, args.concurrency, args.rate_limit, args.chunk_size) == \
+        ('col1', True, 8, 0, 100), 'Arguments were not parsed correctly.'
+
+    with pytest.raises(SystemExit):
+        make_parser().parse_args(['delete', 'col1'])
+
+
+def test_missing_token(monkeypatch):
+    monkeypatch.delenv('WEBFLOW_API_TOKEN', raising = False)
+    assert main(['export', 'col1']) == 2, 'Missing token was not reported.'
+
+
+class StandInAPI(requests.adapters.BaseAdapter):
+    '''
+    Answers the CLI's requests in process, from one in-memory collection (`col1`).
+    '''
+    fields = [
+        {'slug': 'name', 'type': 'PlainText', 'required': True, 'editable': True},
+        {'slug': 'slug', 'type': 'PlainText', 'required': True, 'editable': True},
+        {'slug': 'price', 'type': 'Number', 'required': False, 'editable': True},
+        {'slug': '_archived', 'type': 'Bool', 'required': True, 'editable': True},
+        {'slug': '_draft', 'type': 'Bool', 'required': True, 'editable': True},
+        {'slug': 'created-on', 'type': 'Date', 'required': False, 'editable': False},
+    ]
+
+    def __init__(self):
+        super(StandInAPI, self).__init__()
+        self.items, self.published = [], []
+        self._lock = threading.Lock()
+
+    def send(self, request, **kwargs):
+        url = urlsplit(request.url)
+        query = dict(parse_qsl(url.query))
+        body = json.loads(request.body) if request.body else None
+
+        if url.path == '/user':
+            answer = {'user': {'firstName': 'Test', 'lastName': 'User'}}
+        elif url.path == '/collections/col1':
+            answer = {'_id': 'col1', 'slug': 'products', 'fields': self.fields}
+        elif url.path == '/collections/col1/items' and request.method == 'GET':
+            offset, limit = int(query.get('offset', 0)), int(query.get('limit', 100))
+            answer = {'items': self.items[offset:offset + limit], 'total': len(self.items)}
+        elif url.path == '/collections/col1/items' and request.method == 'POST':
+            with self._lock:
+                answer = {'_id': f'{len(self.items):024x}', 'created-on': '2024-01-01T00:00:00Z', **body['fields']}
+                self.items.append(answer)
+        elif url.path == '/collections/col1/items/publish':
+            self.published += body['itemIds']
+            answer = {'publishedItemIds': body['itemIds'], 'errors': []}
+        else:
+            answer = None
+
+        response = requests.Response()
+        response.status_code = 200 if answer is not None else 404
+        response._content = json.dumps(answer or {'msg': 'Not found'}).encode()
+        response.request, response.url = request, request.url
+        return response
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def api(monkeypatch):
+    api = StandInAPI()
+    monkeypatch.setattr(requests.Session, 'get_adapter', lambda session, url: api)
+
+    # the CLI sets the token and replaces the shared scheduler: restore them for the other tests
+    monkeypatch.setattr(config, '_auth_token', config._auth_token)
+    monkeypatch.setattr(scheduler, '_scheduler', scheduler.get_scheduler())
+    return api
+
+
+def run(tmp_path, *argv) -> tuple[int, dict]:
+    summary = tmp_path / 'summary.json'
+    status = main([*argv, '--token', 'x', '--rate-limit', '0', '--quiet', '--summary', str(summary)])
+    return status, json.loads(summary.read_text())
+
+
+def test_export(api, tmp_path):
+    api.items = [{'_id': f'{i:024x}', 'name': f'Item {i}', 'slug': f'item-{i}'} for i in range(250)]
+    status, summary = run(tmp_path, 'export', 'col1', '-o', str(tmp_path / 'items.jsonl'))
+
+    assert status == 0 and summary['status'] == 'ok', 'Export failed.'
+    assert read_items(str(tmp_path / 'items.jsonl')) == api.items, 'Exported items are wrong.'
+    # the collection, the count, then 3 pages
+    assert (summary['items'], summary['requests']) == (250, 5), 'Summary does not match the export.'
+
+
+def test_import_and_publish(api, tmp_path):
+    path = str(tmp_path / 'items.csv')
+    write_items([{'_id': 'old', 'name': 'Mug', 'price': 12, 'created-on': '2023-01-01'}, {'name': 'Cup'}], path)
+
+    status, summary = run(tmp_path, 'import', 'col1', path)
+    assert status == 0 and (summary['items'], summary['errors']) == (2, 0), 'Import failed.'
+    assert api.items[0]['price'] == 12 and {item['slug'] for item in api.items} == {'mug', 'cup'}, \
+        'Imported items were not typed or slugged.'
+    assert api.items[0]['_draft'] is False and api.items[0]['created-on'] != '2023-01-01', \
+        'System fields were not set by the client.'
+
+    status, summary = run(tmp_path, 'publish', '--collection', 'col1')
+    assert status == 0 and summary['items'] == 2 and summary['failed'] == [], 'Publish failed.'
+    assert sorted(api.published) == sorted(item['_id'] for item in api.items), 'Wrong items were published.'
@@ -0,0 +1,66 @@
+import threading
+import time
+import pytest
+
+from webflow.scheduler import RequestScheduler, INTERACTIVE, BULK
+
+
+def run_lane(scheduler: RequestScheduler, priority: str, served: list) -> threading.Thread:
+    def acquire():
+        scheduler.acquire(priority)
+        served.append(priority)
+
+    thread = threading.Thread(target = acquire)
+    thread.start()
+    return thread
+
+
+def test_unlimited():
+    scheduler = RequestScheduler(rate_limit = None)
+    start = time.monotonic()
+
+    for _ in range(1000):
+        scheduler.acquire(BULK)
+
+    assert time.monotonic() - start < 1, 'An unlimited scheduler is throttling requests.'
+    assert scheduler.stats['requests'] == 1000, 'Requests were not counted.'
+
+
+def test_rate_limit():
+    scheduler = RequestScheduler(rate_limit = 10, period = 0.5, burst = 1)
+    start = time.monotonic()
+
+    for _ in range(6):
+        scheduler.acquire(BULK)
+
+    assert time.monotonic() - start >= 0.2, 'Requests were sent faster than the rate limit.'
+
+
+def test_interactive_skips_bulk():
+    scheduler = RequestScheduler(rate_limit = 1, period = 0.05, burst = 1)
+    served = []
+    threads = [run_lane(scheduler, BULK, served) for _ in range(20)]
+    time.sleep(0.1)
+
+    queued = len(served)
+    threads.append(run_lane(scheduler, INTERACTIVE, served))
+
+    for thread in threads:
+        thread.join()
+
+    assert served.index(INTERACTIVE) <= queued + 1, 'Interactive request waited behind the bulk queue.'
+
+
+def test_penalize():
+    scheduler = RequestScheduler(rate_limit = None)
+    scheduler.penalize(0.2)
+    start = time.monotonic()
+    scheduler.acquire(INTERACTIVE)
+
+    assert time.monotonic() - start >= 0.15, 'Requests were not paused after hitting the rate limit.'
+    assert scheduler.stats['throttled'] == 1, 'Throttled request was not counted.'
+
+
+def test_unknown_priority():
+    with pytest.raises(ValueError):
+        RequestScheduler().acquire('urgent')
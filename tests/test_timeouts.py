@@ -0,0 +1,114 @@
+import threading
+import time
+import pytest
+import requests
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from webflow import config, entity, scheduler
+from webflow.entity import Entity
+from webflow.cms import Collection
+from webflow.utils import parallelize, LatencyTracker
+
+
+class StandInAPI(BaseHTTPRequestHandler):
+    '''
+    Answers `{}` to every GET; `/stall` never answers in time, `/stall-once` only the first time.
+    '''
+    stalled, hits = set(), []
+
+    def do_GET(self):
+        self.hits.append(self.path)
+
+        if self.path == '/stall' or (self.path == '/stall-once' and self.path not in self.stalled):
+            self.stalled.add(self.path)
+            time.sleep(2)
+
+        # the client may have given up already
+        try:
+            self.send_response(200)
+            self.send_header('Content-Length', '2')
+            self.end_headers()
+            self.wfile.write(b'{}')
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope = 'module')
+def api_url():
+    # the token, the shared scheduler and the latency samples are restored for the other test modules
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(config, '_auth_token', config._auth_token or 'test-token')
+        patch.setattr(scheduler, '_scheduler', scheduler.RequestScheduler(None))
+        patch.setattr(entity, '_get_latency', LatencyTracker())
+
+        server = ThreadingHTTPServer(('127.0.0.1', 0), StandInAPI)
+        threading.Thread(target = server.serve_forever, daemon = True).start()
+        yield f'http://127.0.0.1:{server.server_port}'
+        server.shutdown()
+
+
+def test_read_timeout(api_url):
+    api = Entity('test', max_retries = 0, timeout = (1, 0.2))
+    start = time.monotonic()
+
+    with pytest.raises(requests.Timeout):
+        api._get(api_url + '/stall')
+
+    assert time.monotonic() - start < 1, 'Request did not time out.'
+
+
+def test_timeout_retries(api_url):
+    api = Entity('test', timeout = (1, 0.2), timeout_retries = 1)
+    start, hits = time.monotonic(), len(StandInAPI.hits)
+
+    with pytest.raises(requests.Timeout):
+        api._get(api_url + '/stall')
+
+    assert len(StandInAPI.hits) - hits == 2, 'Timed out request was not retried exactly `timeout_retries` times.'
+    assert time.monotonic() - start >= 0.9, 'Timed out request was retried without waiting.'
+
+
+def test_deadline(api_url):
+    api = Entity('test', max_retries = 0)
+    start = time.monotonic()
+
+    # whichever expires first (the deadline or the capped read timeout), the error is the same
+    with pytest.raises(TimeoutError):
+        parallelize(lambda _: api._get(api_url + '/stall'), range(10), threads = 2, deadline = 0.3)
+
+    assert time.monotonic() - start < 1, 'Deadline did not cancel the pending requests.'
+
+
+def test_deadline_read_timeout():
+    def expiring(_):
+        time.sleep(0.2)
+        raise requests.ReadTimeout('capped to the deadline')
+
+    with pytest.raises(TimeoutError):
+        parallelize(expiring, range(4), deadline = 0.2)
+
+
+def test_deadline_covers_count(api_url):
+    collection = Collection.__new__(Collection)
+    Entity.__init__(collection, 'col1')
+    collection._items_url, collection._max_items_per_request = api_url + '/stall', 100
+    start = time.monotonic()
+
+    with pytest.raises(TimeoutError):
+        collection.get_all_items(deadline = 0.3)
+
+    assert time.monotonic() - start < 1, 'The deadline did not cover the first request.'
+
+
+def test_hedged_get(api_url):
+    api = Entity('test', hedge = True)
+
+    for _ in range(20):
+        entity._get_latency.record(0.05)
+
+    start = time.monotonic()
+    assert api._get(api_url + '/stall-once') == {}, 'Hedged request returned a wrong response.'
+    assert time.monotonic() - start < 1, 'Slow request was not hedged.'